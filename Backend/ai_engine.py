@@ -0,0 +1,404 @@
+import copy
+import logging
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from Backend import metrics
+from Backend.chunking import CHUNK_MAX_CHARS, CHUNK_POOLING, MAX_CHUNKS, chunk_similarities, load_chunk_cache
+from Backend.dedupe import load_near_duplicate_index
+from Backend.embedding_index import EmbeddingIndex
+from Backend.history_store import load_history_store
+from Backend.inference import INFERENCE_BACKEND, create_encoder
+from Backend.inference_service import INFERENCE_URL, RemoteEncoder
+from Backend.job_profiles import ProfileRegistry, profile_fingerprint, weighted_coverage
+from Backend.question_bank import QuestionBank
+from Backend.result_cache import load_result_cache, result_key
+from Backend.score_table import load_score_table
+from Backend.skills import load_skill_extractor
+from Backend.startup import timed
+from Backend.storage import record_analyses
+
+MODEL_NAME = os.getenv("SKILLSENSE_MODEL_NAME", "all-MiniLM-L6-v2")
+MODEL_VERSION = f"{MODEL_NAME}:{INFERENCE_BACKEND}"
+ANALYSIS_BATCH_SIZE = int(os.getenv("SKILLSENSE_BATCH_SIZE", "64"))
+SCORING_MODE = os.getenv("SKILLSENSE_SCORING_MODE", "skills")
+
+SCORING_MODES = ["skills", "chunks"]
+# Bump when scoring code changes so cached results from older code are not served
+ANALYSIS_VERSION = 4
+
+logger = logging.getLogger(__name__)
+
+
+def generate_interview_questions(detected_skills, embedding=None, k=8):
+    """Most relevant technical questions from the bank for a skill set.
+
+    With the candidate's skill embedding this is a top-k similarity lookup
+    boosted by skill tags; without one, questions are ranked by tag overlap.
+    Bank items carry no seniority, so every level gets the same questions.
+    """
+    bank = load_question_bank()
+    items = bank.retrieve("technical", k, query=embedding, tags=detected_skills)
+    return [item["text"] for item in items]
+
+# AI FUNCTION (HUGGINGFACE)
+_model = None
+_model_lock = threading.Lock()
+_warmup_thread = None
+_warmup_skipped = False
+
+def load_ai_model():
+    """Load the configured encoder backend once per process.
+    
+    With SKILLSENSE_INFERENCE_URL set, this is a client of the shared
+    inference service instead of a local copy of the model.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                if INFERENCE_URL:
+                    with timed("model load (service)"), metrics.stage("model_load"):
+                        _model = RemoteEncoder(INFERENCE_URL, MODEL_NAME, INFERENCE_BACKEND)
+                else:
+                    with timed(f"model load ({INFERENCE_BACKEND})"), metrics.stage("model_load"):
+                        _model = create_encoder(MODEL_NAME)
+    return _model
+
+def set_ai_model(model):
+    """Replace the process encoder (benchmarks and scripts without the real model)"""
+    global _model
+    with _model_lock:
+        _model = model
+
+def start_model_warmup():
+    """Load the model and run a first encode in a background thread (once)"""
+    global _warmup_thread
+    with _model_lock:
+        if _warmup_thread is not None:
+            return _warmup_thread
+        _warmup_thread = threading.Thread(target=_warm_up, name="model-warmup", daemon=True)
+    _warmup_thread.start()
+    return _warmup_thread
+
+def _warm_up():
+    global _warmup_skipped
+    try:
+        if SCORING_MODE == "skills" and load_score_table(MODEL_VERSION).complete():
+            # Every skill-set lookup is served from the table; the model loads only if chunks mode is picked
+            _warmup_skipped = True
+            return
+        model = load_ai_model()
+        with timed("first inference"):
+            model.encode(["Python, SQL, Docker"])
+        # No-op unless the taxonomy is small enough to enumerate every skill set
+        with timed("score table precompute"):
+            load_score_table(MODEL_VERSION).precompute(model.encode)
+    except Exception:
+        # The first analysis will retry the load; make sure this failure is seen first
+        logger.exception("Model warm-up failed")
+        metrics.inc("skillsense_warmup_failures_total")
+
+def encode_texts(texts, batch_size=ANALYSIS_BATCH_SIZE):
+    """Encode through the process model, loading it only when something is actually encoded"""
+    return load_ai_model().encode(texts, batch_size=batch_size)
+
+def model_ready():
+    return _model is not None
+
+def model_status():
+    """ready, on demand (warm-up skipped, the complete score table serves lookups) or warming up"""
+    if model_ready():
+        return "ready"
+    return "on demand" if _warmup_skipped else "warming up"
+
+@lru_cache(maxsize=None)
+def load_embedding_index():
+    return EmbeddingIndex()
+
+@lru_cache(maxsize=None)
+def load_job_profiles():
+    return ProfileRegistry.from_file(model_name=MODEL_VERSION)
+
+@lru_cache(maxsize=None)
+def load_question_bank():
+    return QuestionBank.from_file(model_name=MODEL_VERSION)
+
+def cos_sim(a, b):
+    """Cosine similarity matrix between the rows of a and b (NumPy, no torch)"""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return a @ b.T
+
+def extract_skills(resume_text):
+    """Detect taxonomy skills in a resume with one pass over the text"""
+    return load_skill_extractor().extract(resume_text)
+
+def build_analysis_result(similarity, detected_skills, profile, embedding=None, scoring_mode=SCORING_MODE):
+    """Blend semantic similarity with weighted skill coverage into the result dict"""
+    job_role = profile["role"]
+    coverage = weighted_coverage(profile, detected_skills) * 100
+    semantic_weight = profile["semantic_weight"]
+    score = min(95, max(25, int(similarity * semantic_weight + coverage * (1 - semantic_weight))))
+    recommendation = "HIRE" if score > 75 else "INTERVIEW" if score > 50 else "REVIEW"
+    
+    # Generate interview questions
+    interview_questions = generate_interview_questions(detected_skills, embedding)
+    
+    return {
+        "ai_score": score,
+        "recommendation": recommendation,
+        "detected_skills": detected_skills[:8],
+        "job_fit": f"{score}% match for {job_role}",
+        "job_role": job_role,
+        "skill_coverage": round(coverage, 1),
+        "strengths": detected_skills[:3],
+        "confidence": "High" if score > 70 else "Medium",
+        "interview_questions": interview_questions,
+        # Stored with the history row so the candidate can be re-scored later
+        "all_skills": detected_skills,
+        "profile_fingerprint": profile_fingerprint(profile),
+        "scoring_mode": scoring_mode,
+    }
+
+def fallback_analysis_result():
+    return {
+        "ai_score": 50,
+        "recommendation": "REVIEW",
+        "detected_skills": [],
+        "job_fit": "AI temporarily unavailable",
+        "strengths": [],
+        "confidence": "Low",
+        "interview_questions": []
+    }
+
+def analysis_context(job_role, scoring_mode=SCORING_MODE):
+    """Everything besides the resume text that changes an analysis: profile, taxonomy, model, settings, question bank"""
+    registry = load_job_profiles()
+    registry.refresh()
+    parts = [
+        profile_fingerprint(registry.get(job_role)), load_skill_extractor().fingerprint, MODEL_VERSION,
+        ANALYSIS_VERSION, scoring_mode, load_question_bank().cache_key(),
+    ]
+    if scoring_mode == "chunks":
+        parts += [CHUNK_POOLING, CHUNK_MAX_CHARS, MAX_CHUNKS]
+    return parts
+
+def analysis_cache_keys(resumes, job_role, scoring_mode=SCORING_MODE):
+    """Result-cache key per resume: its text plus the analysis context"""
+    parts = analysis_context(job_role, scoring_mode)
+    return [result_key(text, *parts) for text in resumes]
+
+def ai_resume_analysis_batch(resumes, job_role="Software Developer", batch_size=ANALYSIS_BATCH_SIZE,
+                             return_embeddings=False, scoring_mode=None, dedupe=False):
+    """Score many resumes with one batched encode and one vectorized cos_sim.
+    
+    scoring_mode "skills" compares the detected skill list with the job;
+    "chunks" compares every chunk of the full resume text instead, so
+    experience descriptions count too. Resumes analyzed before with the same
+    profile, model and settings come straight from the result cache. With
+    dedupe=True, near-duplicates of saved resumes reuse the saved analysis
+    and are marked with "duplicate_of" (the saved row id),
+    "duplicate_candidate" and "duplicate_similarity". With
+    return_embeddings=True also returns each resume's skill embedding (None
+    when no skills were found or the resume is a duplicate) for the
+    candidate search index.
+    """
+    scoring_mode = scoring_mode or SCORING_MODE
+    if scoring_mode not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode {scoring_mode!r}; expected one of {SCORING_MODES}")
+    metrics.inc("skillsense_resumes_analyzed_total", value=len(resumes))
+    results = [None] * len(resumes)
+    resume_embeddings = [None] * len(resumes)
+    index = load_near_duplicate_index() if dedupe else None
+    if index is not None:
+        try:
+            with metrics.stage("near_duplicate_lookup"):
+                context = analysis_context(job_role, scoring_mode)
+                matches = [index.find(index.signature(text), context) for text in resumes]
+            for i, match in enumerate(matches):
+                if match is not None:
+                    results[i] = dict(
+                        match["result"], duplicate_of=match["id"], duplicate_candidate=match["candidate"],
+                        duplicate_similarity=round(match["similarity"], 3),
+                    )
+            metrics.inc("skillsense_near_duplicates_total", value=sum(m is not None for m in matches))
+        except Exception:
+            logger.exception("Near-duplicate lookup failed; analyzing every resume")
+    
+    cache = load_result_cache()
+    keys = None
+    pending = [i for i, result in enumerate(results) if result is None]
+    if cache is not None and pending:
+        try:
+            with metrics.stage("result_cache_lookup"):
+                keys = analysis_cache_keys(resumes, job_role, scoring_mode)
+                cached = cache.get_many([keys[i] for i in pending])
+            for i in pending:
+                if keys[i] in cached:
+                    # Copies: callers add candidate/level/id to each result
+                    results[i], resume_embeddings[i] = copy.deepcopy(cached[keys[i]])
+        except Exception:
+            logger.exception("Result cache lookup failed; analyzing without it")
+            keys = None
+    
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        fresh, fresh_embeddings, ok = _analyze_batch([resumes[i] for i in missing], job_role, batch_size, scoring_mode)
+        for i, result, embedding in zip(missing, fresh, fresh_embeddings):
+            results[i], resume_embeddings[i] = result, embedding
+        if ok and keys is not None:
+            try:
+                with metrics.stage("result_cache_store"):
+                    cache.put_many([(keys[i], results[i], resume_embeddings[i]) for i in missing])
+            except Exception:
+                logger.exception("Result cache store failed")
+    return (results, resume_embeddings) if return_embeddings else results
+
+def _analyze_batch(resumes, job_role, batch_size, scoring_mode):
+    """(results, embeddings, ok) for resumes that were not cached; ok is False on fallback"""
+    ok = True
+    try:
+        with metrics.stage("analysis"):
+            registry = load_job_profiles()
+            registry.refresh()
+            profile = registry.get(job_role)
+            extractor = load_skill_extractor()
+            
+            # Extract skills for every resume first
+            with metrics.stage("skill_extraction"):
+                indices_per_resume = [extractor.extract_indices(text) for text in resumes]
+            skills_per_resume = [[extractor.skills[i] for i in indices] for indices in indices_per_resume]
+            
+            # Each distinct skill set comes from the score table (encoded on
+            # first miss only); the job embedding is precomputed
+            unique_sets = list(dict.fromkeys(tuple(indices) for indices in indices_per_resume if indices))
+            similarities = {}
+            text_embeddings = {}
+            if unique_sets:
+                load_question_bank().ensure_embeddings(encode_texts, batch_size)
+                job_emb = registry.embedding(job_role, encode_texts)
+                with metrics.stage("score_table"):
+                    embeddings = load_score_table(MODEL_VERSION).embeddings(unique_sets, encode_texts, batch_size)
+                with metrics.stage("similarity"):
+                    scores = cos_sim(embeddings, job_emb[None, :])[:, 0] * 100
+                unique_texts = [", ".join(extractor.skills[i] for i in indices) for indices in unique_sets]
+                similarities = dict(zip(unique_texts, scores.tolist()))
+                text_embeddings = dict(zip(unique_texts, embeddings))
+            
+            chunk_scores = [None] * len(resumes)
+            if scoring_mode == "chunks":
+                job_emb = registry.embedding(job_role, encode_texts)
+                with metrics.stage("chunk_scoring"):
+                    chunk_scores = chunk_similarities(resumes, job_emb, encode_texts, load_chunk_cache(MODEL_VERSION), batch_size)
+            
+            results = []
+            resume_embeddings = []
+            with metrics.stage("question_retrieval"):
+                for detected_skills, chunk_score in zip(skills_per_resume, chunk_scores):
+                    if chunk_score is not None:
+                        similarity = chunk_score
+                    elif detected_skills:
+                        similarity = similarities[", ".join(detected_skills)]
+                    else:
+                        similarity = 20
+                    embedding = text_embeddings.get(", ".join(detected_skills))
+                    results.append(build_analysis_result(similarity, detected_skills, profile, embedding, scoring_mode))
+                    resume_embeddings.append(embedding)
+    except Exception:
+        # Keep the UI usable, but never silently: log it and count the fallback
+        logger.exception("Resume analysis failed for %d resumes (role %r)", len(resumes), job_role)
+        metrics.inc("skillsense_analysis_fallbacks_total", value=len(resumes))
+        results = [fallback_analysis_result() for _ in resumes]
+        resume_embeddings = [None] * len(resumes)
+        ok = False
+    return results, resume_embeddings, ok
+
+def ai_resume_analysis(resume_text, job_role="Software Developer", scoring_mode=None):
+    return ai_resume_analysis_batch([resume_text], job_role, scoring_mode=scoring_mode)[0]
+
+def save_analyses(results, embeddings, resumes=None, scoring_mode=None):
+    """Insert history rows, add them to the columnar history store and index their embeddings.
+    
+    Results marked as near-duplicates get no new row; their id is the row
+    they duplicate. With the resume texts, new rows are also added to the
+    near-duplicate index so later copies can reuse them.
+    """
+    fresh = [i for i, r in enumerate(results) if r.get("duplicate_of") is None]
+    new_results = [results[i] for i in fresh]
+    with metrics.stage("history_write"):
+        new_ids = record_analyses(new_results) if new_results else []
+    if new_results:
+        with metrics.stage("history_segment"):
+            load_history_store().append(new_results)
+    indexed = [(row_id, embeddings[i]) for row_id, i in zip(new_ids, fresh) if embeddings[i] is not None]
+    if indexed:
+        with metrics.stage("index_append"):
+            load_embedding_index().append([i for i, _ in indexed], [emb for _, emb in indexed])
+    index = load_near_duplicate_index()
+    if resumes is not None and index is not None:
+        # Fallback results carry no job_role and are never reused
+        by_role = {}
+        for row_id, i in zip(new_ids, fresh):
+            if results[i].get("job_role"):
+                by_role.setdefault(results[i]["job_role"], []).append((row_id, i))
+        try:
+            with metrics.stage("near_duplicate_index"):
+                for job_role, rows in by_role.items():
+                    index.add_many(
+                        [(row_id, index.signature(resumes[i]), results[i]) for row_id, i in rows],
+                        analysis_context(job_role, scoring_mode or SCORING_MODE),
+                    )
+        except Exception:
+            logger.exception("Near-duplicate indexing failed")
+    ids = [r.get("duplicate_of") for r in results]
+    for row_id, i in zip(new_ids, fresh):
+        ids[i] = row_id
+    return ids
+
+def history_report(row):
+    """Rebuild a report results dict from a stored history row"""
+    detected_skills = row.get("detected_skills", [])
+    return {
+        "candidate": row["candidate"],
+        "level": row.get("level") or "N/A",
+        "ai_score": int(row.get("ai_score") or 0),
+        "recommendation": row.get("recommendation") or "N/A",
+        "detected_skills": detected_skills,
+        "job_fit": f"{int(row.get('ai_score') or 0)}% match for {row.get('job_role')}",
+        "interview_questions": generate_interview_questions(detected_skills),
+    }
+
+def encode_search_query(text):
+    """Embed a JD or resume in the same space as the stored resume embeddings"""
+    indices = load_skill_extractor().extract_indices(text)
+    if indices:
+        return load_score_table(MODEL_VERSION).embeddings([indices], encode_texts)[0]
+    return load_ai_model().encode([text])[0]
+
+def interview_framework(jd_text, technical=5, behavioral=5, tasks=3, use_model=True):
+    """Technical questions, behavioral questions and tasks retrieved for one JD"""
+    detected_skills = extract_skills(jd_text)
+    bank = load_question_bank()
+    query = None
+    if use_model:
+        try:
+            bank.ensure_embeddings(encode_texts)
+            query = encode_search_query(jd_text)
+        except Exception:
+            # Tag overlap still follows the JD; only the semantic ranking is lost
+            logger.exception("Question retrieval falling back to skill tags")
+            metrics.inc("skillsense_question_fallbacks_total")
+    return {
+        "detected_skills": detected_skills,
+        "technical_questions": [i["text"] for i in bank.retrieve("technical", technical, query, detected_skills)],
+        "behavioral_questions": [i["text"] for i in bank.retrieve("behavioral", behavioral, query, detected_skills)],
+        "tasks": [i["text"] for i in bank.retrieve("task", tasks, query, detected_skills)],
+    }
+
+metrics.describe("skillsense_warmup_failures_total", "Background model warm-ups that raised")
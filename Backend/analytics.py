@@ -1,4 +1,10 @@
-from backend.database import CandidateResult
+from sqlalchemy import Integer, and_, case, cast, delete, func, insert, or_, select
+
+from Backend.database import CandidateResult
+
+# The analyzer only produces total_score; the per-dimension columns
+# (technical, problem_solving, ...) are never filled, so they are not aggregated
+RUBRIC_COLUMNS = ["total_score"]
 
 
 def get_top_candidates(db, limit=10):
@@ -14,6 +20,155 @@ def get_all_results(db):
     return db.query(CandidateResult).all()
 
 
-def clear_all_results(db):
-    db.query(CandidateResult).delete()
-    db.commit()
+# SCORE DISTRIBUTIONS
+def score_summary(db, jd_title=None):
+    """Count, mean, min and max of total_score in one aggregate query"""
+    query = select(
+        func.count(CandidateResult.id),
+        func.avg(CandidateResult.total_score),
+        func.min(CandidateResult.total_score),
+        func.max(CandidateResult.total_score),
+    )
+    if jd_title is not None:
+        query = query.where(CandidateResult.jd_title == jd_title)
+    count, mean, low, high = db.execute(query).one()
+    return {"count": count, "mean": mean, "min": low, "max": high}
+
+
+def _floor(db, expr):
+    # SQLite has no floor() before 3.35; CAST truncates, which is floor for the non-negative values used here
+    if db.get_bind().dialect.name == "sqlite":
+        return cast(expr, Integer)
+    return func.floor(expr)
+
+
+def _ceil(db, expr):
+    if db.get_bind().dialect.name == "sqlite":
+        return cast(expr + 0.999999, Integer)
+    return func.ceil(expr)
+
+
+def score_histogram(db, bins=10, low=0, high=100, jd_title=None):
+    """[{"bin_start", "bin_end", "count"}] for total_score, binned in SQL"""
+    width = (high - low) / bins
+    raw = _floor(db, (CandidateResult.total_score - low) / width)
+    bin_index = case((raw < 0, 0), (raw > bins - 1, bins - 1), else_=raw)
+    query = select(bin_index.label("bin"), func.count()).where(CandidateResult.total_score.isnot(None))
+    if jd_title is not None:
+        query = query.where(CandidateResult.jd_title == jd_title)
+    counts = dict(db.execute(query.group_by("bin")).all())
+    return [
+        {"bin_start": low + i * width, "bin_end": low + (i + 1) * width, "count": counts.get(i, 0)}
+        for i in range(bins)
+    ]
+
+
+# PER-JD RUBRIC STATS
+def rubric_averages(db):
+    """Per jd_title: count and average of every rubric dimension"""
+    columns = [func.avg(getattr(CandidateResult, c)).label(c) for c in RUBRIC_COLUMNS]
+    query = (
+        select(CandidateResult.jd_title, func.count(CandidateResult.id).label("count"), *columns)
+        .group_by(CandidateResult.jd_title)
+        .order_by(CandidateResult.jd_title)
+    )
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def rubric_percentiles(db, column="total_score", percentiles=(0.5, 0.9, 0.99)):
+    """Per jd_title nearest-rank percentiles of one rubric column, in one window-function scan"""
+    value = getattr(CandidateResult, column)
+    ranked = (
+        select(
+            CandidateResult.jd_title,
+            value.label("value"),
+            func.row_number().over(partition_by=CandidateResult.jd_title, order_by=value).label("rn"),
+            func.count().over(partition_by=CandidateResult.jd_title).label("n"),
+        )
+        .where(value.isnot(None))
+        .subquery()
+    )
+    # nearest rank: ceil(p * n), at least 1
+    targets = [case((_ceil(db, ranked.c.n * p) < 1, 1), else_=_ceil(db, ranked.c.n * p)) for p in percentiles]
+    rows = db.execute(
+        select(ranked.c.jd_title, ranked.c.value, ranked.c.rn, *targets).where(ranked.c.rn.in_(targets))
+    )
+    out = {}
+    for jd_title, v, rn, *ranks in rows:
+        for p, rank in zip(percentiles, ranks):
+            if rn == rank:
+                out.setdefault(jd_title, {})[f"p{int(p * 100)}"] = v
+    return out
+
+
+# HIRING FUNNEL
+def _time_bucket(column, bucket, dialect):
+    if dialect == "sqlite":
+        formats = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+        return func.strftime(formats[bucket], column)
+    return func.date_trunc(bucket, column)
+
+
+def hiring_funnel(db, bucket="week", jd_title=None):
+    """Per time bucket: analyzed, interview-or-better and hire counts"""
+    period = _time_bucket(CandidateResult.created_at, bucket, db.get_bind().dialect.name).label("period")
+    query = select(
+        period,
+        func.count(CandidateResult.id).label("analyzed"),
+        func.sum(case((CandidateResult.recommendation.in_(["INTERVIEW", "HIRE"]), 1), else_=0)).label("interview"),
+        func.sum(case((CandidateResult.recommendation == "HIRE", 1), else_=0)).label("hire"),
+    )
+    if jd_title is not None:
+        query = query.where(CandidateResult.jd_title == jd_title)
+    return [dict(row._mapping) for row in db.execute(query.group_by(period).order_by(period))]
+
+
+# PAGINATED LISTING
+_ORDERINGS = {
+    "score": CandidateResult.total_score,
+    "recent": CandidateResult.created_at,
+}
+
+
+def list_results_page(db, after=None, limit=50, order="score", jd_title=None):
+    """Keyset-paginated results, descending by score or recency.
+
+    Returns (rows, next_cursor); pass next_cursor back as after to get the
+    following page. Cost per page stays flat however deep the page is.
+    """
+    key = _ORDERINGS[order]
+    query = select(CandidateResult).where(key.isnot(None))
+    if jd_title is not None:
+        query = query.where(CandidateResult.jd_title == jd_title)
+    if after is not None:
+        last_key, last_id = after
+        query = query.where(or_(key < last_key, and_(key == last_key, CandidateResult.id < last_id)))
+    rows = db.execute(query.order_by(key.desc(), CandidateResult.id.desc()).limit(limit)).scalars().all()
+    next_cursor = (getattr(rows[-1], key.key), rows[-1].id) if len(rows) == limit else None
+    return rows, next_cursor
+
+
+# BATCHED WRITES
+def bulk_insert_results(db, rows, batch_size=5000):
+    """Insert result dicts (CandidateResult column names) in executemany batches.
+
+    Returns the new ids in input order; the caller's session commits.
+    """
+    statement = insert(CandidateResult).returning(CandidateResult.id, sort_by_parameter_order=True)
+    ids = []
+    for start in range(0, len(rows), batch_size):
+        ids.extend(db.execute(statement, rows[start:start + batch_size]).scalars().all())
+    return ids
+
+
+def clear_all_results(db, batch_size=10000):
+    """Delete every result in id-range batches so no single transaction grows huge"""
+    deleted = 0
+    while True:
+        ids = db.execute(select(CandidateResult.id).order_by(CandidateResult.id).limit(batch_size)).scalars().all()
+        if not ids:
+            break
+        db.execute(delete(CandidateResult).where(CandidateResult.id.between(ids[0], ids[-1])))
+        db.commit()
+        deleted += len(ids)
+    return deleted
@@ -0,0 +1,166 @@
+"""Full-resume scoring: split resumes into chunks and compare every chunk to the job.
+
+Chunks are sections (blank-line separated blocks) split into sentences and
+packed up to CHUNK_MAX_CHARS. Each chunk embedding is cached on disk under
+a hash of the model and the normalized chunk text, so boilerplate that
+repeats across resumes (headers, objective statements, shared templates)
+is encoded once.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from Backend import metrics
+
+CHUNK_CACHE_FILE = os.getenv("SKILLSENSE_CHUNK_CACHE_FILE", "chunk_embeddings.db")
+CHUNK_MAX_CHARS = int(os.getenv("SKILLSENSE_CHUNK_MAX_CHARS", "400"))
+CHUNK_MIN_CHARS = 20
+MAX_CHUNKS = int(os.getenv("SKILLSENSE_MAX_CHUNKS", "64"))
+CHUNK_POOLING = os.getenv("SKILLSENSE_CHUNK_POOLING", "max")
+POOL_TEMPERATURE = 0.05
+SQL_BATCH = 500
+
+POOLINGS = ["max", "weighted"]
+
+_SECTION_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+
+def normalize_chunk(text):
+    return " ".join(text.lower().split())
+
+
+def split_chunks(text, max_chars=CHUNK_MAX_CHARS, max_chunks=MAX_CHUNKS):
+    """Section-aware chunks: sentences packed up to max_chars, never across sections"""
+    chunks = []
+    for section in _SECTION_SPLIT.split(text):
+        current = ""
+        for sentence in _SENTENCE_SPLIT.split(section):
+            sentence = " ".join(sentence.split())
+            if not sentence:
+                continue
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current} {sentence}" if current else sentence[:max_chars]
+        if current:
+            chunks.append(current)
+    chunks = [c for c in chunks if len(c) >= CHUNK_MIN_CHARS]
+    return list(dict.fromkeys(chunks))[:max_chunks]
+
+
+def pool_similarities(similarities, pooling=CHUNK_POOLING):
+    """One 0-1 score from per-chunk similarities: the best chunk, or a softmax-weighted mean"""
+    if pooling == "max":
+        return float(similarities.max())
+    if pooling == "weighted":
+        weights = np.exp((similarities - similarities.max()) / POOL_TEMPERATURE)
+        return float((weights * similarities).sum() / weights.sum())
+    raise ValueError(f"Unknown chunk pooling {pooling!r}; expected one of {POOLINGS}")
+
+
+class ChunkEmbeddingCache:
+    """Content-addressed chunk embeddings in a SQLite file, shared across processes"""
+
+    def __init__(self, path=CHUNK_CACHE_FILE, model_name=""):
+        self.path = path
+        self.model_name = model_name
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS chunks (key TEXT PRIMARY KEY, dim INTEGER, vector BLOB)")
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def key(self, chunk):
+        return hashlib.sha1(f"{self.model_name}\n{normalize_chunk(chunk)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """{key: float32 vector} for the keys already cached"""
+        found = {}
+        db = self._connect()
+        keys = list(keys)
+        for start in range(0, len(keys), SQL_BATCH):
+            batch = keys[start:start + SQL_BATCH]
+            rows = db.execute(
+                f"SELECT key, vector FROM chunks WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return found
+
+    def put_many(self, items):
+        with self._connect() as db:
+            db.executemany(
+                "INSERT OR IGNORE INTO chunks (key, dim, vector) VALUES (?, ?, ?)",
+                [(key, len(vector), np.asarray(vector, dtype=np.float16).tobytes()) for key, vector in items],
+            )
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute("DELETE FROM chunks")
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+
+def embed_chunks(chunks, encode, cache, batch_size=64):
+    """Normalized embeddings for chunks, encoding only the ones not cached yet"""
+    keys = [cache.key(c) for c in chunks]
+    vectors = cache.get_many(set(keys))
+    missing = {}
+    for key, chunk in zip(keys, chunks):
+        if key not in vectors:
+            missing.setdefault(key, chunk)
+    misses = sum(1 for k in keys if k in missing)
+    metrics.cache_event("chunk_embedding", True, len(keys) - misses)
+    metrics.cache_event("chunk_embedding", False, misses)
+    if missing:
+        with metrics.stage("chunk_encode"):
+            encoded = np.asarray(encode(list(missing.values()), batch_size=batch_size), dtype=np.float32)
+        encoded /= np.maximum(np.linalg.norm(encoded, axis=1, keepdims=True), 1e-12)
+        # Round through float16 like the stored copy, so cached and fresh scores agree
+        encoded = encoded.astype(np.float16).astype(np.float32)
+        new = list(zip(missing, encoded))
+        cache.put_many(new)
+        vectors.update(new)
+    return keys, vectors
+
+
+def chunk_similarities(resumes, job_embedding, encode, cache, batch_size=64, pooling=CHUNK_POOLING):
+    """Pooled 0-100 chunk similarity per resume (None when a resume has no usable chunks)"""
+    chunks_per_resume = [split_chunks(text) for text in resumes]
+    all_chunks = [c for chunks in chunks_per_resume for c in chunks]
+    if not all_chunks:
+        return [None] * len(resumes)
+    keys, vectors = embed_chunks(all_chunks, encode, cache, batch_size)
+
+    job = np.asarray(job_embedding, dtype=np.float32)
+    job = job / max(np.linalg.norm(job), 1e-12)
+    scores = []
+    position = 0
+    for chunks in chunks_per_resume:
+        resume_keys = keys[position:position + len(chunks)]
+        position += len(chunks)
+        if not resume_keys:
+            scores.append(None)
+            continue
+        similarities = np.stack([vectors[k] for k in resume_keys]) @ job
+        scores.append(pool_similarities(similarities, pooling) * 100)
+    return scores
+
+
+@lru_cache(maxsize=None)
+def load_chunk_cache(model_name=""):
+    return ChunkEmbeddingCache(model_name=model_name)
@@ -1,15 +1,32 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime
+import os
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, inspect, text, Column, Index, Integer, String, Float, DateTime, Text
 from sqlalchemy.orm import declarative_base, sessionmaker
 from datetime import datetime
 
-DATABASE_URL = "sqlite:///users.db"
+DATABASE_URL = os.getenv("SKILLSENSE_DATABASE_URL", "sqlite:///users.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(bind=engine)
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+    pool_pre_ping=True,
+)
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
 
 Base = declarative_base()
 
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers and the single writer work concurrently across processes
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -24,16 +41,62 @@ class CandidateResult(Base):
 
     id = Column(Integer, primary_key=True)
     jd_title = Column(String)
-    candidate_name = Column(String)
+    candidate_name = Column(String, index=True)
 
     technical = Column(Float)
     problem_solving = Column(Float)
     system_design = Column(Float)
     communication = Column(Float)
 
-    total_score = Column(Float)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    total_score = Column(Float, index=True)
+    recommendation = Column(String)
+    level = Column(String)
+    skills = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    # Everything needed to re-score without the resume text: the full skill
+    # set, the profile version total_score was computed against and how
+    all_skills = Column(Text)
+    profile_fingerprint = Column(String)
+    scoring_mode = Column(String)
+
+    __table_args__ = (
+        Index("ix_candidate_results_jd_score", "jd_title", "total_score"),
+        Index("ix_candidate_results_jd_fingerprint", "jd_title", "profile_fingerprint"),
+    )
+
+
+@contextmanager
+def get_session():
+    """One pooled session per request: commit on success, roll back on error"""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _upgrade_existing_tables():
+    # create_all never alters existing tables, so add new columns and indexes here
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _upgrade_existing_tables()
@@ -0,0 +1,187 @@
+"""Near-duplicate resume detection with MinHash signatures and an LSH index.
+
+Each saved resume gets a MinHash signature over its word shingles. The
+signature is cut into bands and every band hash is indexed, so a lookup
+only compares against resumes that share at least one band (sub-linear in
+the stored corpus) and then keeps those whose estimated Jaccard similarity
+reaches DEDUPE_THRESHOLD. The index lives next to the history store and
+keeps each resume's analysis, so a re-submitted or lightly edited resume
+reuses it instead of being analyzed again.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from Backend import metrics
+from Backend.history_store import HISTORY_DIR
+
+DEDUPE_FILE = os.getenv("SKILLSENSE_DEDUPE_FILE", os.path.join(HISTORY_DIR, "near_duplicates.db"))
+DEDUPE_THRESHOLD = float(os.getenv("SKILLSENSE_DEDUPE_THRESHOLD", "0.85"))
+NUM_PERM = 128
+SHINGLE_WORDS = 5
+SQL_BATCH = 500
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text, k=SHINGLE_WORDS):
+    """Set of 32-bit hashes of the text's overlapping k-word shingles"""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) <= k:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))} if tokens else set()
+    return {zlib.crc32(" ".join(tokens[i:i + k]).encode("utf-8")) for i in range(len(tokens) - k + 1)}
+
+
+def choose_bands(threshold, num_perm=NUM_PERM):
+    """(bands, rows) whose collision curve rises just below the threshold.
+
+    A pair with similarity s shares a band with probability
+    1 - (1 - s**rows)**bands; the curve's midpoint (1/bands)**(1/rows) is
+    kept a little under the threshold so true matches are rarely missed.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        if midpoint <= threshold - 0.05:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """MinHash LSH over saved resumes, stored in one SQLite file"""
+
+    def __init__(self, path=DEDUPE_FILE, threshold=DEDUPE_THRESHOLD, num_perm=NUM_PERM):
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = choose_bands(threshold, num_perm)
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, int(_MERSENNE), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE), num_perm, dtype=np.uint64)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS resumes ("
+                "id INTEGER PRIMARY KEY, context TEXT NOT NULL, candidate TEXT, signature BLOB NOT NULL, result TEXT NOT NULL)"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS bands (band INTEGER NOT NULL, hash INTEGER NOT NULL, id INTEGER NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS ix_bands_hash ON bands (band, hash)")
+            db.execute("CREATE INDEX IF NOT EXISTS ix_bands_id ON bands (id)")
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # SIGNATURES
+    def signature(self, text):
+        """uint32 MinHash signature, or None for text without any words"""
+        hashes = shingles(text)
+        if not hashes:
+            return None
+        x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        # (a * x + b) mod p, one row per shingle; the uint64 product wraps like the reference MinHash
+        permuted = ((x[:, None] * self._a + self._b) % _MERSENNE) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_hashes(self, signature):
+        hashes = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8).digest()
+            hashes.append((band, int.from_bytes(digest, "big", signed=True)))
+        return hashes
+
+    @staticmethod
+    def context_key(context):
+        """Stable key for everything besides the text that changes an analysis"""
+        return hashlib.sha1(json.dumps(context, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    # LOOKUP
+    def find(self, signature, context):
+        """Best stored match {"id", "candidate", "similarity", "result"} at or above the threshold, or None"""
+        if signature is None:
+            return None
+        db = self._connect()
+        candidates = set()
+        for band, value in self._band_hashes(signature):
+            candidates.update(
+                row[0] for row in db.execute("SELECT id FROM bands WHERE band = ? AND hash = ?", (band, value))
+            )
+        if not candidates:
+            return None
+        best = None
+        candidates = list(candidates)
+        for start in range(0, len(candidates), SQL_BATCH):
+            batch = candidates[start:start + SQL_BATCH]
+            rows = db.execute(
+                f"SELECT id, candidate, signature, result FROM resumes WHERE context = ? AND id IN ({','.join('?' * len(batch))})",
+                [self.context_key(context), *batch],
+            ).fetchall()
+            for row_id, candidate, blob, result in rows:
+                similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+                if similarity >= self.threshold and (best is None or similarity > best["similarity"]):
+                    best = {"id": row_id, "candidate": candidate, "similarity": similarity, "result": result}
+        metrics.cache_event("near_duplicate", best is not None)
+        if best is not None:
+            best["result"] = json.loads(best["result"])
+        return best
+
+    # WRITING
+    def add_many(self, items, context):
+        """Index (history id, signature, result) triples; results are stored for reuse"""
+        items = [(row_id, signature, result) for row_id, signature, result in items if signature is not None]
+        if not items:
+            return
+        key = self.context_key(context)
+        with self._connect() as db:
+            # A re-indexed id must not keep matching through its old bands
+            db.executemany("DELETE FROM bands WHERE id = ?", [(row_id,) for row_id, _, _ in items])
+            db.executemany(
+                "INSERT OR REPLACE INTO resumes (id, context, candidate, signature, result) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        row_id, key, result.get("candidate"), signature.astype(np.uint32).tobytes(),
+                        json.dumps({k: v for k, v in result.items() if k not in ("id", "timestamp")}, default=str),
+                    )
+                    for row_id, signature, result in items
+                ],
+            )
+            db.executemany(
+                "INSERT INTO bands (band, hash, id) VALUES (?, ?, ?)",
+                [(band, value, row_id) for row_id, signature, _ in items for band, value in self._band_hashes(signature)],
+            )
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute("DELETE FROM bands")
+            db.execute("DELETE FROM resumes")
+
+
+metrics.describe("skillsense_near_duplicates_total", "Submissions linked to a saved near-duplicate instead of analyzed")
+
+
+@lru_cache(maxsize=None)
+def load_near_duplicate_index():
+    """The process-wide index, or None when SKILLSENSE_DEDUPE_THRESHOLD is 0"""
+    if DEDUPE_THRESHOLD <= 0:
+        return None
+    return NearDuplicateIndex()
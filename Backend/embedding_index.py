@@ -0,0 +1,255 @@
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer deployments only
+    fcntl = None
+
+INDEX_DIR = os.getenv("SKILLSENSE_INDEX_DIR", "embedding_index")
+ANN_THRESHOLD = int(os.getenv("SKILLSENSE_ANN_THRESHOLD", "50000"))
+ANN_NPROBE = int(os.getenv("SKILLSENSE_ANN_NPROBE", "8"))
+SEARCH_CHUNK_ROWS = 16384
+
+
+class EmbeddingIndex:
+    """Append-only on-disk matrix of normalized float16 embeddings.
+
+    vectors.f16 holds one row per stored resume and ids.i64 the matching
+    CandidateResult id. Both are plain binary files read through np.memmap,
+    so searching never turns stored resumes into Python objects. Past
+    ANN_THRESHOLD rows an IVF index (k-means lists) narrows each search to
+    the closest ANN_NPROBE lists plus any rows appended since it was built.
+    The lists are trained in a background thread; until they exist, searches
+    scan exactly, and while they are retrained the old lists keep serving.
+    """
+
+    def __init__(self, path=INDEX_DIR, dim=None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._vectors_file = os.path.join(path, "vectors.f16")
+        self._ids_file = os.path.join(path, "ids.i64")
+        self._meta_file = os.path.join(path, "meta.json")
+        self._lock = threading.Lock()
+        self._ivf = None
+        self._ivf_mtime = None
+        self._ivf_builder = None
+        self._id_sort = None
+        self.dim = None
+        if self._read_dim() is None:
+            self.dim = dim
+
+    def _read_dim(self):
+        # Another process may create the index after this instance was built
+        if self.dim is None and os.path.exists(self._meta_file):
+            with open(self._meta_file, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        return self.dim
+
+    # WRITING
+    @contextmanager
+    def _file_lock(self):
+        with self._lock, open(os.path.join(self.path, ".lock"), "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def append(self, ids, vectors):
+        """Append rows for the given result ids; vectors are normalized first"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return
+        if self._read_dim() is None:
+            self.dim = vectors.shape[1]
+            with open(self._meta_file, "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim}, f)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        with self._file_lock():
+            # Trim a torn tail left by a crashed writer before appending
+            count = self.count()
+            for file, itemsize in [(self._vectors_file, 2 * self.dim), (self._ids_file, 8)]:
+                if os.path.exists(file) and os.path.getsize(file) != count * itemsize:
+                    with open(file, "r+b") as f:
+                        f.truncate(count * itemsize)
+            with open(self._vectors_file, "ab") as f:
+                f.write(vectors.astype(np.float16).tobytes())
+            with open(self._ids_file, "ab") as f:
+                f.write(np.asarray(ids, dtype=np.int64).tobytes())
+
+    def clear(self):
+        with self._file_lock():
+            for name in ["vectors.f16", "ids.i64", "ivf.npz"]:
+                file = os.path.join(self.path, name)
+                if os.path.exists(file):
+                    os.remove(file)
+            self._ivf = None
+
+    # READING
+    def count(self):
+        if self._read_dim() is None or not os.path.exists(self._ids_file):
+            return 0
+        return min(os.path.getsize(self._vectors_file) // (2 * self.dim), os.path.getsize(self._ids_file) // 8)
+
+    def _open(self):
+        n = self.count()
+        if not n:
+            return None, None
+        vectors = np.memmap(self._vectors_file, dtype=np.float16, mode="r", shape=(n, self.dim))
+        ids = np.memmap(self._ids_file, dtype=np.int64, mode="r", shape=(n,))
+        return vectors, ids
+
+    def vector(self, result_id):
+        """Stored embedding for one result id, or None"""
+        vectors, ids = self._open()
+        if ids is None:
+            return None
+        rows = np.flatnonzero(ids == result_id)
+        return None if not len(rows) else np.asarray(vectors[rows[-1]], dtype=np.float32)
+
+    def vectors(self, result_ids):
+        """(float32 matrix, found mask) for many result ids; rows not stored are zero"""
+        result_ids = np.asarray(result_ids, dtype=np.int64)
+        out = np.zeros((len(result_ids), self._read_dim() or 0), dtype=np.float32)
+        found = np.zeros(len(result_ids), dtype=bool)
+        vectors, ids = self._open()
+        if ids is None or not len(result_ids):
+            return out, found
+        order, sorted_ids = self._id_order(ids)
+        pos = np.searchsorted(sorted_ids, result_ids, side="right") - 1
+        found = (pos >= 0) & (sorted_ids[np.maximum(pos, 0)] == result_ids)
+        out[found] = vectors[order[pos[found]]]
+        return out, found
+
+    def _id_order(self, ids):
+        # Sorted ids, cached until the ids file changes; stable, so the
+        # newest row wins when an id was appended more than once
+        key = (len(ids), os.path.getmtime(self._ids_file))
+        if self._id_sort is None or self._id_sort[0] != key:
+            order = np.argsort(ids, kind="stable")
+            self._id_sort = (key, order, np.asarray(ids[order]))
+        return self._id_sort[1], self._id_sort[2]
+
+    def search(self, query, k=10, exclude_ids=()):
+        """Top-k (result_id, cosine) pairs for a query vector, best first"""
+        vectors, ids = self._open()
+        if ids is None:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        query = query / max(np.linalg.norm(query), 1e-12)
+
+        if len(ids) > ANN_THRESHOLD:
+            rows = self._ivf_candidates(vectors, query)
+        else:
+            rows = None
+
+        best_rows, best_scores = [], []
+        total = len(ids) if rows is None else len(rows)
+        for start in range(0, total, SEARCH_CHUNK_ROWS):
+            chunk_rows = np.arange(start, min(start + SEARCH_CHUNK_ROWS, total)) if rows is None else rows[start:start + SEARCH_CHUNK_ROWS]
+            block = vectors[chunk_rows[0]:chunk_rows[-1] + 1] if rows is None else vectors[chunk_rows]
+            # float16 on disk, float32 BLAS for the product
+            scores = np.asarray(block, dtype=np.float32) @ query
+            take = min(k + len(exclude_ids), len(scores))
+            top = np.argpartition(-scores, take - 1)[:take]
+            best_rows.append(chunk_rows[top])
+            best_scores.append(scores[top])
+
+        best_rows = np.concatenate(best_rows)
+        best_scores = np.concatenate(best_scores)
+        order = np.argsort(-best_scores)
+        excluded = set(exclude_ids)
+        results = []
+        for i in order:
+            result_id = int(ids[best_rows[i]])
+            if result_id in excluded:
+                continue
+            results.append((result_id, float(best_scores[i])))
+            if len(results) == k:
+                break
+        return results
+
+    # APPROXIMATE INDEX (IVF)
+    def _ivf_candidates(self, vectors, query):
+        """Rows to score, or None for a full scan while the first lists are trained"""
+        ivf = self._load_ivf(len(vectors))
+        if ivf is None:
+            return None
+        centroids, order, offsets, trained = ivf
+        probes = np.argsort(-(centroids @ query))[:ANN_NPROBE]
+        parts = [order[offsets[p]:offsets[p + 1]] for p in probes]
+        # Rows appended after training are always scanned exactly
+        parts.append(np.arange(trained, len(vectors)))
+        return np.sort(np.concatenate(parts))
+
+    def _load_ivf(self, n):
+        ivf_file = os.path.join(self.path, "ivf.npz")
+        if os.path.exists(ivf_file):
+            mtime = os.path.getmtime(ivf_file)
+            if self._ivf is None or self._ivf_mtime != mtime:
+                with np.load(ivf_file) as data:
+                    self._ivf = (data["centroids"], data["order"], data["offsets"], int(data["trained"]))
+                self._ivf_mtime = mtime
+        elif self._ivf is not None:
+            # Cleared by another process
+            self._ivf = None
+        if self._ivf is not None and self._ivf[3] > n:
+            self._ivf = None
+        # Retrain once a tenth of the rows are newer than the lists, never on the search thread
+        if self._ivf is None or n - self._ivf[3] > n // 10:
+            self.build_ivf_in_background()
+        return self._ivf
+
+    def build_ivf_in_background(self):
+        with self._lock:
+            if self._ivf_builder is not None and self._ivf_builder.is_alive():
+                return self._ivf_builder
+            self._ivf_builder = threading.Thread(target=self.build_ivf, name="ivf-build", daemon=True)
+        self._ivf_builder.start()
+        return self._ivf_builder
+
+    def build_ivf(self, iterations=10, seed=0):
+        """Train k-means lists over the stored vectors and save them"""
+        vectors, _ = self._open()
+        n = len(vectors)
+        centroids, order, offsets = train_ivf(vectors, iterations=iterations, seed=seed)
+
+        ivf_file = os.path.join(self.path, "ivf.npz")
+        # Unique temp name: concurrent rebuilds (threads or processes) never share one
+        with tempfile.NamedTemporaryFile(dir=self.path, suffix=".tmp.npz", delete=False) as f:
+            np.savez(f, centroids=centroids, order=order, offsets=offsets, trained=n)
+        os.replace(f.name, ivf_file)
+        self._ivf = (centroids, order, offsets, n)
+        self._ivf_mtime = os.path.getmtime(ivf_file)
+
+
+def train_ivf(vectors, nlist=None, iterations=10, seed=0):
+    """k-means over normalized rows; returns (centroids, row order by list, list offsets)"""
+    n = len(vectors)
+    nlist = nlist or max(1, int(np.sqrt(n)))
+    rng = np.random.default_rng(seed)
+    sample = np.asarray(vectors[np.sort(rng.choice(n, min(n, nlist * 64), replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = sample[assign == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+    assign = np.empty(n, dtype=np.int32)
+    for start in range(0, n, SEARCH_CHUNK_ROWS):
+        block = np.asarray(vectors[start:start + SEARCH_CHUNK_ROWS], dtype=np.float32)
+        assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    order = np.argsort(assign, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))])
+    return centroids, order, offsets
@@ -0,0 +1,378 @@
+"""Columnar copy of the analysis history for the History page.
+
+Every saved batch becomes one small Parquet segment; a background thread
+merges runs of small segments into sorted segments of up to
+COMPACT_TARGET_ROWS rows. manifest.json lists the live segments with their
+row count and timestamp range, so the default newest-first page only opens
+the newest segments, and every read projects just the columns it shows.
+The database stays the source of truth; this store can be rebuilt from it.
+"""
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from Backend import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer deployments only
+    fcntl = None
+
+HISTORY_DIR = os.getenv("SKILLSENSE_HISTORY_DIR", "history_store")
+COMPACT_MIN_SEGMENTS = int(os.getenv("SKILLSENSE_HISTORY_COMPACT_SEGMENTS", "16"))
+COMPACT_TARGET_ROWS = int(os.getenv("SKILLSENSE_HISTORY_SEGMENT_ROWS", "50000"))
+ROW_GROUP_ROWS = 8192
+
+SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("timestamp", pa.timestamp("us")),
+    ("candidate", pa.string()),
+    ("job_role", pa.string()),
+    ("recommendation", pa.string()),
+    ("ai_score", pa.int32()),
+    ("level", pa.string()),
+    ("detected_skills", pa.string()),
+])
+
+DISPLAY_COLUMNS = ["id", "timestamp", "candidate", "job_role", "recommendation", "ai_score", "level"]
+SORT_COLUMNS = ["timestamp", "ai_score", "candidate", "job_role"]
+
+
+def _to_table(results):
+    return pa.Table.from_pylist([
+        {
+            "id": r["id"],
+            "timestamp": r["timestamp"],
+            "candidate": r.get("candidate"),
+            "job_role": r.get("job_role"),
+            "recommendation": r.get("recommendation"),
+            "ai_score": int(r["ai_score"]) if r.get("ai_score") is not None else None,
+            "level": r.get("level"),
+            "detected_skills": ", ".join(r.get("detected_skills") or []),
+        }
+        for r in results
+    ], schema=SCHEMA)
+
+
+def _filter_expression(filters):
+    """pyarrow expression for {"job_role", "recommendations", "min_score", "candidate"}"""
+    expr = None
+    filters = filters or {}
+    parts = []
+    if filters.get("job_role"):
+        parts.append(ds.field("job_role") == filters["job_role"])
+    if filters.get("recommendations"):
+        parts.append(ds.field("recommendation").isin(list(filters["recommendations"])))
+    if filters.get("min_score"):
+        parts.append(ds.field("ai_score") >= int(filters["min_score"]))
+    if filters.get("candidate"):
+        parts.append(pc.match_substring(ds.field("candidate"), filters["candidate"], ignore_case=True))
+    for part in parts:
+        expr = part if expr is None else expr & part
+    return expr
+
+
+def _empty(columns):
+    return pa.table({c: pa.array([], SCHEMA.field(c).type) for c in columns})
+
+
+def _rows(table):
+    rows = table.to_pylist()
+    for row in rows:
+        if "detected_skills" in row:
+            row["detected_skills"] = row["detected_skills"].split(", ") if row["detected_skills"] else []
+    return rows
+
+
+class HistoryStore:
+    """Append-only Parquet segments plus a manifest, safe across processes"""
+
+    def __init__(self, path=HISTORY_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._manifest_file = os.path.join(path, "manifest.json")
+        self._lock = threading.Lock()
+        self._compactor = None
+
+    # MANIFEST
+    @contextmanager
+    def _file_lock(self, name=".lock", blocking=True):
+        """Exclusive lock across processes; yields False if non-blocking and busy"""
+        with open(os.path.join(self.path, name), "a") as lock_file:
+            if fcntl:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    yield False
+                    return
+            try:
+                yield True
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def segments(self):
+        if not os.path.exists(self._manifest_file):
+            return []
+        with open(self._manifest_file, "r", encoding="utf-8") as f:
+            return json.load(f)["segments"]
+
+    def _write_manifest(self, segments):
+        tmp = self._manifest_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"segments": segments}, f)
+        os.replace(tmp, self._manifest_file)
+
+    def _write_segment(self, table, prefix):
+        name = f"{prefix}-{uuid.uuid4().hex}.parquet"
+        tmp = os.path.join(self.path, name + ".tmp")
+        pq.write_table(table, tmp, row_group_size=ROW_GROUP_ROWS)
+        os.replace(tmp, os.path.join(self.path, name))
+        timestamps = table.column("timestamp")
+        ids = table.column("id")
+        return {
+            "file": name,
+            "rows": table.num_rows,
+            # Microseconds since the epoch, comparable without parsing
+            "min_ts": pc.min(timestamps).value,
+            "max_ts": pc.max(timestamps).value,
+            "min_id": pc.min(ids).as_py(),
+            "max_id": pc.max(ids).as_py(),
+        }
+
+    # WRITING
+    def append(self, results):
+        """Store saved analyses (each with id and timestamp) as one new segment"""
+        if not results:
+            return
+        entry = self._write_segment(_to_table(results), "seg")
+        with self._lock, self._file_lock():
+            self._write_manifest(self.segments() + [entry])
+        if sum(1 for s in self.segments() if s["file"].startswith("seg-")) >= COMPACT_MIN_SEGMENTS:
+            self.compact_in_background()
+
+    def update_scores(self, scores):
+        """Rewrite ai_score and recommendation for {id: (ai_score, recommendation)}.
+
+        Only segments whose id range can hold one of the ids are opened, and
+        only those that do are rewritten; returns the number rewritten.
+        """
+        if not scores:
+            return 0
+        ids = pa.array(sorted(scores), pa.int64())
+        low, high = ids[0].as_py(), ids[-1].as_py()
+        rewritten = 0
+        # Compaction must not swap these segments out while they are rewritten
+        with self._file_lock(".compact.lock"):
+            for segment in self.segments():
+                if segment.get("max_id", high) < low or segment.get("min_id", low) > high:
+                    continue
+                table = pq.read_table(os.path.join(self.path, segment["file"]))
+                if not pc.any(pc.is_in(table.column("id"), value_set=ids)).as_py():
+                    continue
+                old = zip(table.column("ai_score").to_pylist(), table.column("recommendation").to_pylist())
+                new = [scores.get(row_id, pair) for row_id, pair in zip(table.column("id").to_pylist(), old)]
+                for name, values in [("ai_score", [p[0] for p in new]), ("recommendation", [p[1] for p in new])]:
+                    position = table.schema.get_field_index(name)
+                    table = table.set_column(position, SCHEMA.field(name), pa.array(values, SCHEMA.field(name).type))
+                entry = self._write_segment(table, segment["file"].split("-", 1)[0])
+                with self._lock, self._file_lock():
+                    segments = self.segments()
+                    # A concurrent clear() may have dropped the segment meanwhile
+                    replaced = any(s["file"] == segment["file"] for s in segments)
+                    if replaced:
+                        self._write_manifest([entry if s["file"] == segment["file"] else s for s in segments])
+                self._remove(segment["file"] if replaced else entry["file"])
+                rewritten += replaced
+        return rewritten
+
+    def clear(self):
+        with self._lock, self._file_lock():
+            for segment in self.segments():
+                self._remove(segment["file"])
+            self._write_manifest([])
+
+    def _remove(self, name):
+        try:
+            os.remove(os.path.join(self.path, name))
+        except FileNotFoundError:
+            pass
+
+    # COMPACTION
+    def compact_in_background(self):
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return self._compactor
+            self._compactor = threading.Thread(target=self.compact, name="history-compaction", daemon=True)
+        self._compactor.start()
+        return self._compactor
+
+    def _compaction_groups(self, segments):
+        """Runs of adjacent small segments whose merged size stays within target"""
+        groups, run, rows = [], [], 0
+        for segment in segments:
+            if segment["rows"] >= COMPACT_TARGET_ROWS or rows + segment["rows"] > COMPACT_TARGET_ROWS:
+                if len(run) > 1:
+                    groups.append(run)
+                run, rows = [], 0
+            if segment["rows"] < COMPACT_TARGET_ROWS:
+                run.append(segment)
+                rows += segment["rows"]
+        if len(run) > 1:
+            groups.append(run)
+        return groups
+
+    def compact(self):
+        """Merge small segments; returns the number of segments merged away"""
+        merged = 0
+        with self._file_lock(".compact.lock", blocking=False) as acquired:
+            if not acquired:
+                return 0
+            with metrics.stage("history_compaction"):
+                for group in self._compaction_groups(self.segments()):
+                    try:
+                        table = pa.concat_tables([pq.read_table(os.path.join(self.path, s["file"])) for s in group])
+                    except FileNotFoundError:
+                        # clear() removed the group before it was read
+                        return merged
+                    table = table.sort_by([("timestamp", "ascending"), ("id", "ascending")])
+                    entry = self._write_segment(table, "compact")
+                    names = {s["file"] for s in group}
+                    # Appends may have landed meanwhile: swap the group in place, keep everything else
+                    with self._lock, self._file_lock():
+                        segments = self.segments()
+                        position = next((i for i, s in enumerate(segments) if s["file"] in names), None)
+                        if position is None:
+                            # clear() dropped the group meanwhile; the merged copy is orphaned
+                            self._remove(entry["file"])
+                            return merged
+                        segments = [s for s in segments if s["file"] not in names]
+                        segments.insert(position, entry)
+                        self._write_manifest(segments)
+                    for name in names:
+                        self._remove(name)
+                    merged += len(group) - 1
+        return merged
+
+    # READING
+    def _read(self, segment, columns, expr):
+        return pq.read_table(os.path.join(self.path, segment["file"]), columns=columns, filters=expr)
+
+    def _retrying(self, read):
+        # A compaction can delete a segment between reading the manifest and opening it
+        for _ in range(3):
+            try:
+                return read(self.segments())
+            except FileNotFoundError:
+                continue
+        return read(self.segments())
+
+    def count(self, filters=None):
+        expr = _filter_expression(filters)
+        if expr is None:
+            return sum(s["rows"] for s in self.segments())
+
+        def read(segments):
+            if not segments:
+                return 0
+            dataset = ds.dataset([os.path.join(self.path, s["file"]) for s in segments], schema=SCHEMA, format="parquet")
+            return dataset.count_rows(filter=expr)
+        return self._retrying(read)
+
+    def page(self, offset=0, limit=50, sort_by="timestamp", descending=True, filters=None, columns=DISPLAY_COLUMNS):
+        """One page of history rows, sorted and filtered before slicing"""
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort history by {sort_by!r}; expected one of {SORT_COLUMNS}")
+        expr = _filter_expression(filters)
+        columns = list(dict.fromkeys(["id"] + list(columns)))
+        with metrics.stage("history_page"):
+            if sort_by == "timestamp" and descending:
+                table = self._retrying(lambda segments: self._newest_page(segments, offset, limit, expr, columns))
+            else:
+                table = self._retrying(
+                    lambda segments: self._sorted_page(segments, offset, limit, sort_by, descending, expr, columns)
+                )
+        return _rows(table)
+
+    def _newest_page(self, segments, offset, limit, expr, columns):
+        # Open segments newest first and stop once no older segment can reach the page
+        need = offset + limit
+        order = [("timestamp", "descending"), ("id", "descending")]
+        read_columns = list(dict.fromkeys(columns + ["timestamp"]))
+        tables = []
+        collected = 0
+        for segment in sorted(segments, key=lambda s: s["max_ts"], reverse=True):
+            if collected >= need:
+                timestamps = pa.concat_tables(tables).column("timestamp")
+                boundary = pc.sort_indices(timestamps, sort_keys=[("", "descending")])[need - 1].as_py()
+                if segment["max_ts"] < timestamps[boundary].value:
+                    break
+            table = self._read(segment, read_columns, expr)
+            tables.append(table)
+            collected += table.num_rows
+        if not tables:
+            return _empty(columns)
+        table = pa.concat_tables(tables).sort_by(order).slice(offset, limit)
+        return table.select(columns)
+
+    def _sorted_page(self, segments, offset, limit, sort_by, descending, expr, columns):
+        # Sort on the key column alone, then fetch the display columns for the page's ids
+        if not segments:
+            return _empty(columns)
+        direction = "descending" if descending else "ascending"
+        dataset = ds.dataset([os.path.join(self.path, s["file"]) for s in segments], schema=SCHEMA, format="parquet")
+        keys = dataset.to_table(columns=[sort_by, "id"], filter=expr)
+        keys = keys.sort_by([(sort_by, direction), ("id", direction)]).slice(offset, limit)
+        ids = keys.column("id").combine_chunks()
+        table = dataset.to_table(columns=columns, filter=ds.field("id").isin(ids))
+        positions = pc.index_in(table.column("id"), value_set=ids)
+        return table.take(pc.sort_indices(positions))
+
+
+def rebuild_from_db(store, batch_size=COMPACT_TARGET_ROWS):
+    """Refill the store from the database in id order, one segment per batch"""
+    from sqlalchemy import select
+
+    from Backend.database import CandidateResult, get_session
+    from Backend.storage import _history_dict
+
+    store.clear()
+    total = 0
+    last_id = 0
+    with get_session() as db:
+        while True:
+            rows = db.execute(
+                select(CandidateResult).where(CandidateResult.id > last_id).order_by(CandidateResult.id).limit(batch_size)
+            ).scalars().all()
+            if not rows:
+                break
+            store.append([_history_dict(r) for r in rows])
+            last_id = rows[-1].id
+            total += len(rows)
+    return total
+
+
+def sync_with_db(store):
+    """Rebuild the store if its row count drifted from the database (first run, crash mid-save)"""
+    from sqlalchemy import func, select
+
+    from Backend.database import CandidateResult, get_session
+
+    with get_session() as db:
+        db_count = db.execute(select(func.count(CandidateResult.id))).scalar()
+    if store.count() != db_count:
+        return rebuild_from_db(store)
+    return 0
+
+
+@lru_cache(maxsize=None)
+def load_history_store():
+    return HistoryStore()
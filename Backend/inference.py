@@ -0,0 +1,229 @@
+"""Pluggable CPU inference backends for the sentence encoder.
+
+SKILLSENSE_INFERENCE_BACKEND selects one of:
+  torch      - SentenceTransformer on PyTorch (reference path)
+  onnx       - exported ONNX graph on ONNX Runtime, no torch at serve time
+  onnx-int8  - the same graph with dynamically int8-quantized weights
+
+The ONNX files are exported on first use (this step needs torch) or ahead of
+time with:  python -m Backend.inference export
+Check drift against torch with:  python -m Backend.inference check
+Pick a thread count with:        python -m Backend.inference tune
+"""
+import argparse
+import inspect
+import os
+import time
+
+import numpy as np
+
+INFERENCE_BACKEND = os.getenv("SKILLSENSE_INFERENCE_BACKEND", "torch")
+INFERENCE_THREADS = int(os.getenv("SKILLSENSE_INFERENCE_THREADS", "0"))
+ONNX_DIR = os.getenv("SKILLSENSE_ONNX_DIR", "onnx_models")
+MAX_SEQ_LENGTH = 256
+
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+
+
+class TorchEncoder:
+    def __init__(self, model_name, threads=0):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.backend = "torch"
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def encode(self, texts, batch_size=32):
+        return self.model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True)
+
+
+class OnnxEncoder:
+    """Mean-pooled, L2-normalized MiniLM embeddings from ONNX Runtime"""
+
+    def __init__(self, model_name, threads=0, quantized=False, onnx_dir=ONNX_DIR):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.backend = "onnx-int8" if quantized else "onnx"
+        model_dir = export_onnx(model_name, onnx_dir)
+        model_file = quantize_onnx(model_dir) if quantized else os.path.join(model_dir, "model.onnx")
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts, batch_size=32):
+        texts = list(texts)
+        out = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            hidden = self.session.run(None, feeds)[0]
+
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            out.append(pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12))
+        if not out:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(out).astype(np.float32)
+
+
+# EXPORT
+def _model_dir(model_name, onnx_dir):
+    return os.path.join(onnx_dir, model_name.replace("/", "__"))
+
+
+def export_onnx(model_name, onnx_dir=ONNX_DIR):
+    """Export the transformer and tokenizer once; returns the model directory"""
+    model_dir = _model_dir(model_name, onnx_dir)
+    model_file = os.path.join(model_dir, "model.onnx")
+    if os.path.exists(model_file):
+        return model_dir
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(model_dir, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    st_model.tokenizer.save_pretrained(model_dir)
+
+    dummy = st_model.tokenizer(["export"], return_tensors="pt")
+    input_names = [name for name in ["input_ids", "attention_mask", "token_type_ids"] if name in dummy]
+
+    class _Wrapper(torch.nn.Module):
+        # Positional inputs in a fixed order, whatever the transformers signature
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs))).last_hidden_state
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # Newer torch defaults to the dynamo exporter; keep the TorchScript one
+        export_kwargs["dynamo"] = False
+    tmp = model_file + ".tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            _Wrapper(),
+            tuple(dummy[name] for name in input_names),
+            tmp,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **export_kwargs,
+        )
+    os.replace(tmp, model_file)
+    return model_dir
+
+
+def quantize_onnx(model_dir):
+    """Dynamic int8 weight quantization of the exported graph (cached on disk)"""
+    quantized_file = os.path.join(model_dir, "model.int8.onnx")
+    if not os.path.exists(quantized_file):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        tmp = quantized_file + ".tmp"
+        quantize_dynamic(os.path.join(model_dir, "model.onnx"), tmp, weight_type=QuantType.QInt8)
+        os.replace(tmp, quantized_file)
+    return quantized_file
+
+
+def create_encoder(model_name, backend=INFERENCE_BACKEND, threads=INFERENCE_THREADS):
+    if backend == "torch":
+        return TorchEncoder(model_name, threads)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEncoder(model_name, threads, quantized=backend == "onnx-int8")
+    raise ValueError(f"Unknown inference backend {backend!r}; expected one of {BACKENDS}")
+
+
+# ACCURACY AND TUNING
+SAMPLE_TEXTS = [
+    "Python, SQL, Docker",
+    "JavaScript, React, Node.js, TypeScript",
+    "Kubernetes, Terraform, AWS, CI/CD, Linux",
+    "Pandas, NumPy, scikit-learn, Machine Learning, Statistics",
+    "Java, Spring Boot, Microservices, PostgreSQL",
+    "Apache Spark, Apache Airflow, Apache Kafka, ETL",
+    "Communication, Leadership, Agile, Scrum",
+    "C++, Embedded Systems, Linux, Concurrency",
+]
+
+
+def compare_backends(model_name, candidate, reference="torch", texts=SAMPLE_TEXTS, job_text="python, sql, docker, aws"):
+    """How far the candidate backend drifts from the reference backend.
+
+    Reports embedding agreement (cosine between the two paths per text) and
+    drift of the 0-100 similarity scores the analyzer actually uses.
+    """
+    ref = create_encoder(model_name, reference)
+    cand = create_encoder(model_name, candidate)
+    ref_emb = np.asarray(ref.encode(texts + [job_text]), dtype=np.float32)
+    cand_emb = np.asarray(cand.encode(texts + [job_text]), dtype=np.float32)
+    ref_emb /= np.linalg.norm(ref_emb, axis=1, keepdims=True)
+    cand_emb /= np.linalg.norm(cand_emb, axis=1, keepdims=True)
+
+    agreement = (ref_emb * cand_emb).sum(axis=1)
+    ref_scores = ref_emb[:-1] @ ref_emb[-1] * 100
+    cand_scores = cand_emb[:-1] @ cand_emb[-1] * 100
+    score_drift = np.abs(ref_scores - cand_scores)
+    return {
+        "reference": reference,
+        "candidate": candidate,
+        "min_embedding_cosine": round(float(agreement.min()), 5),
+        "mean_score_drift": round(float(score_drift.mean()), 3),
+        "max_score_drift": round(float(score_drift.max()), 3),
+    }
+
+
+def tune_threads(model_name, backend=INFERENCE_BACKEND, thread_counts=None, texts=SAMPLE_TEXTS, repeats=20):
+    """Per-resume encode latency (ms) for each thread count"""
+    thread_counts = thread_counts or sorted({1, 2, 4, os.cpu_count() or 1})
+    rows = []
+    for threads in thread_counts:
+        encoder = create_encoder(model_name, backend, threads)
+        encoder.encode(texts[:1])
+        start = time.perf_counter()
+        for i in range(repeats):
+            encoder.encode([texts[i % len(texts)]])
+        rows.append({"threads": threads, "ms_per_resume": round((time.perf_counter() - start) * 1000 / repeats, 2)})
+    return rows
+
+
+if __name__ == "__main__":
+    from Backend.ai_engine import MODEL_NAME
+
+    parser = argparse.ArgumentParser(description="SkillSense inference backends")
+    parser.add_argument("command", choices=["export", "check", "tune"])
+    parser.add_argument("--backend", default="onnx-int8", choices=BACKENDS)
+    parser.add_argument("--model", default=MODEL_NAME)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        model_dir = export_onnx(args.model)
+        print(f"Exported {model_dir}")
+        print(f"Quantized {quantize_onnx(model_dir)}")
+    elif args.command == "check":
+        print(compare_backends(args.model, args.backend))
+    else:
+        for row in tune_threads(args.model, args.backend):
+            print(f"{row['threads']:>3} threads  {row['ms_per_resume']:>8.2f} ms/resume")
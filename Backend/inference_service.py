@@ -0,0 +1,338 @@
+"""Shared local inference service with dynamic micro-batching.
+
+One process owns the encoder; Streamlit workers and scripts reach it over
+HTTP (TCP or a Unix socket) instead of loading their own copy. Concurrent
+requests are coalesced into micro-batches: a batch is sent to the encoder
+once it holds SERVICE_MAX_BATCH texts or its first request has waited
+SERVICE_MAX_WAIT_MS. When SERVICE_MAX_QUEUE texts are already waiting, new
+requests get 503 with Retry-After, and the client backs off and retries.
+
+Run it with:       python -m Backend.inference_service --url http://127.0.0.1:8765
+Point clients at:  SKILLSENSE_INFERENCE_URL=http://127.0.0.1:8765
+(or unix:///tmp/skillsense-inference.sock for both)
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse
+
+import numpy as np
+
+from Backend import metrics
+
+try:
+    from socketserver import UnixStreamServer
+except ImportError:  # Windows: TCP only
+    UnixStreamServer = None
+
+INFERENCE_URL = os.getenv("SKILLSENSE_INFERENCE_URL", "")
+SERVICE_MAX_BATCH = int(os.getenv("SKILLSENSE_SERVICE_MAX_BATCH", "64"))
+SERVICE_MAX_WAIT_MS = float(os.getenv("SKILLSENSE_SERVICE_MAX_WAIT_MS", "5"))
+SERVICE_MAX_QUEUE = int(os.getenv("SKILLSENSE_SERVICE_MAX_QUEUE", "1024"))
+SERVICE_TIMEOUT = float(os.getenv("SKILLSENSE_SERVICE_TIMEOUT", "60"))
+SERVICE_RETRIES = 5
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class _Request:
+    def __init__(self, texts):
+        self.texts = texts
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.vectors = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Coalesces concurrent encode calls into batches for one encoder"""
+
+    def __init__(self, encoder, max_batch=SERVICE_MAX_BATCH, max_wait_ms=SERVICE_MAX_WAIT_MS,
+                 max_queue=SERVICE_MAX_QUEUE):
+        self.encoder = encoder
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self._pending = deque()
+        self._queued = 0
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, name="micro-batcher", daemon=True).start()
+
+    def queued(self):
+        with self._cond:
+            return self._queued
+
+    def submit(self, texts):
+        """Embeddings for texts, encoded in the next micro-batch; QueueFull when at capacity"""
+        request = _Request(list(texts))
+        with self._cond:
+            # An oversized request is still accepted into an empty queue
+            if self._queued and self._queued + len(request.texts) > self.max_queue:
+                raise QueueFull(f"{self._queued} texts queued")
+            self._pending.append(request)
+            self._queued += len(request.texts)
+            self._cond.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.vectors
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            # Hold the batch open until it is full or the oldest request has waited max_wait
+            deadline = self._pending[0].enqueued + self.max_wait
+            while self._queued < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, size = [], 0
+            while self._pending and (not batch or size + len(self._pending[0].texts) <= self.max_batch):
+                request = self._pending.popleft()
+                batch.append(request)
+                size += len(request.texts)
+            self._queued -= size
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            texts = [text for request in batch for text in request.texts]
+            try:
+                with metrics.stage("service_batch"):
+                    vectors = np.asarray(self.encoder.encode(texts, batch_size=self.max_batch), dtype=np.float32)
+                metrics.inc("skillsense_service_texts_total", value=len(texts))
+                metrics.inc("skillsense_service_batches_total")
+                start = 0
+                for request in batch:
+                    request.vectors = vectors[start:start + len(request.texts)]
+                    start += len(request.texts)
+            except Exception as exc:
+                for request in batch:
+                    request.error = exc
+            for request in batch:
+                request.done.set()
+
+
+# SERVER
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; Nagle would hold the body back
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/health":
+            self._send(200, json.dumps(self.server.info()).encode("utf-8"))
+        elif path == "/metrics":
+            self._send(200, metrics.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/encode":
+            self._send(404, b'{"error": "not found"}')
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            texts = payload["texts"]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError("texts must be a list of strings")
+        except (ValueError, KeyError, TypeError) as exc:
+            self._send(400, json.dumps({"error": str(exc)}).encode("utf-8"))
+            return
+        try:
+            vectors = self.server.batcher.submit(texts)
+        except QueueFull as exc:
+            metrics.inc("skillsense_service_rejected_total", value=len(texts))
+            self._send(503, json.dumps({"error": f"queue full: {exc}"}).encode("utf-8"), headers={"Retry-After": "1"})
+            return
+        except Exception as exc:
+            self._send(500, json.dumps({"error": f"{type(exc).__name__}: {exc}"}).encode("utf-8"))
+            return
+        self._send(200, vectors.tobytes(), "application/octet-stream",
+                   {"X-Embedding-Shape": f"{vectors.shape[0]},{vectors.shape[1] if vectors.ndim == 2 else 0}"})
+
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UnixHandler(_Handler):
+    disable_nagle_algorithm = False  # TCP_NODELAY does not apply to Unix sockets
+
+
+class _ServiceMixin:
+    daemon_threads = True
+    request_queue_size = 128
+
+    def info(self):
+        return {
+            "model": self.model_name,
+            "backend": getattr(self.batcher.encoder, "backend", ""),
+            "max_batch": self.batcher.max_batch,
+            "max_wait_ms": self.batcher.max_wait * 1000,
+            "queued": self.batcher.queued(),
+            "max_queue": self.batcher.max_queue,
+        }
+
+
+class _TCPServer(_ServiceMixin, ThreadingHTTPServer):
+    pass
+
+
+if UnixStreamServer is not None:
+    class _UnixServer(_ServiceMixin, ThreadingMixIn, UnixStreamServer):
+        pass
+
+
+def make_server(encoder, url=DEFAULT_URL, model_name="", max_batch=SERVICE_MAX_BATCH,
+                max_wait_ms=SERVICE_MAX_WAIT_MS, max_queue=SERVICE_MAX_QUEUE):
+    """Bound (not yet serving) service for encoder at an http:// or unix:// url"""
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        if UnixStreamServer is None:
+            raise ValueError("Unix sockets are not supported on this platform; use an http:// url")
+        if os.path.exists(parsed.path):
+            os.remove(parsed.path)
+        server = _UnixServer(parsed.path, _UnixHandler)
+    elif parsed.scheme == "http":
+        server = _TCPServer((parsed.hostname or "127.0.0.1", parsed.port or 80), _Handler)
+    else:
+        raise ValueError(f"Unsupported inference service url {url!r}; use http:// or unix://")
+    server.model_name = model_name
+    server.batcher = MicroBatcher(encoder, max_batch, max_wait_ms, max_queue)
+    return server
+
+
+# CLIENT
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class RemoteEncoder:
+    """Encoder interface backed by the inference service (one keep-alive connection per thread).
+
+    Refuses to start when the service runs a different model or backend,
+    since every on-disk embedding cache is keyed by model and backend.
+    """
+
+    def __init__(self, url=INFERENCE_URL or DEFAULT_URL, model_name=None, backend=None,
+                 timeout=SERVICE_TIMEOUT, retries=SERVICE_RETRIES):
+        self.url = url
+        self._parsed = urlparse(url)
+        self.timeout = timeout
+        self.retries = retries
+        self._local = threading.local()
+        info = self.health()
+        if model_name is not None and info["model"] != model_name:
+            raise RuntimeError(f"Inference service at {url} runs {info['model']!r}, expected {model_name!r}")
+        if backend is not None and info["backend"] != backend:
+            raise RuntimeError(f"Inference service at {url} uses backend {info['backend']!r}, expected {backend!r}")
+        self.backend = info["backend"]
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._parsed.scheme == "unix":
+                conn = _UnixHTTPConnection(self._parsed.path, self.timeout)
+            else:
+                conn = http.client.HTTPConnection(self._parsed.hostname, self._parsed.port or 80, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method, path, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.getheaders(), response.read()
+            except (ConnectionError, http.client.HTTPException):
+                # The service dropped an idle keep-alive connection: reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+    def health(self):
+        status, _, data = self._request("GET", "/health")
+        if status != 200:
+            raise RuntimeError(f"Inference service at {self.url} is unhealthy ({status})")
+        return json.loads(data)
+
+    def encode(self, texts, batch_size=32):
+        body = json.dumps({"texts": list(texts)}).encode("utf-8")
+        for attempt in range(self.retries + 1):
+            status, headers, data = self._request("POST", "/encode", body)
+            if status == 200:
+                rows, dim = map(int, dict(headers)["X-Embedding-Shape"].split(","))
+                return np.frombuffer(data, dtype=np.float32).reshape(rows, dim)
+            if status == 503 and attempt < self.retries:
+                # Backpressure: the service queue is full, back off and retry
+                metrics.inc("skillsense_service_retries_total")
+                time.sleep(0.05 * 2 ** attempt)
+                continue
+            raise RuntimeError(f"Inference service error {status}: {data[:200].decode('utf-8', 'replace')}")
+
+
+metrics.describe("skillsense_service_texts_total", "Texts encoded by the inference service")
+metrics.describe("skillsense_service_batches_total", "Micro-batches run by the inference service")
+metrics.describe("skillsense_service_rejected_total", "Texts rejected by the inference service because its queue was full")
+metrics.describe("skillsense_service_retries_total", "Client retries after the inference service applied backpressure")
+
+
+if __name__ == "__main__":
+    from Backend.ai_engine import MODEL_NAME
+    from Backend.inference import INFERENCE_BACKEND, create_encoder
+
+    parser = argparse.ArgumentParser(description="SkillSense shared inference service")
+    parser.add_argument("--url", default=INFERENCE_URL or DEFAULT_URL, help="http://host:port or unix:///path.sock")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--backend", default=INFERENCE_BACKEND)
+    parser.add_argument("--max-batch", type=int, default=SERVICE_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=SERVICE_MAX_WAIT_MS)
+    parser.add_argument("--max-queue", type=int, default=SERVICE_MAX_QUEUE)
+    args = parser.parse_args()
+
+    encoder = create_encoder(args.model, args.backend)
+    encoder.encode(["Python, SQL, Docker"])
+    server = make_server(encoder, args.url, args.model, args.max_batch, args.max_wait_ms, args.max_queue)
+    print(f"Serving {args.model} ({args.backend}) at {args.url}, "
+          f"batches of up to {args.max_batch} within {args.max_wait_ms} ms")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
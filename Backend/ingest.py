@@ -0,0 +1,141 @@
+"""Resume file ingestion: PDF, DOCX and TXT files, alone or inside ZIP archives.
+
+Text is pulled page by page (paragraph by paragraph for DOCX) and stops at
+the page/character limits, so one huge file cannot blow up memory.
+Extraction runs in a process pool with a bounded number of files in flight,
+and results are yielded as soon as each file is done.
+"""
+import io
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+MAX_FILE_BYTES = int(os.getenv("SKILLSENSE_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+MAX_PAGES = int(os.getenv("SKILLSENSE_MAX_PAGES", "20"))
+MAX_CHARS = int(os.getenv("SKILLSENSE_MAX_CHARS", "100000"))
+MAX_ZIP_MEMBERS = int(os.getenv("SKILLSENSE_MAX_ZIP_MEMBERS", "2000"))
+EXTRACT_WORKERS = int(os.getenv("SKILLSENSE_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+# TEXT EXTRACTION (runs in worker processes)
+def _extract_pdf(data):
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    parts, chars, pages = [], 0, 0
+    truncated = len(reader.pages) > MAX_PAGES
+    for page in reader.pages[:MAX_PAGES]:
+        text = page.extract_text() or ""
+        parts.append(text)
+        chars += len(text)
+        pages += 1
+        if chars >= MAX_CHARS:
+            truncated = truncated or pages < len(reader.pages)
+            break
+    return "\n".join(parts), pages, truncated
+
+
+def _extract_docx(data):
+    from docx import Document
+
+    document = Document(io.BytesIO(data))
+    parts, chars, truncated = [], 0, False
+    for paragraph in document.paragraphs:
+        parts.append(paragraph.text)
+        chars += len(paragraph.text)
+        if chars >= MAX_CHARS:
+            truncated = True
+            break
+    return "\n".join(parts), None, truncated
+
+
+def _extract_txt(data):
+    text = data.decode("utf-8", errors="ignore")
+    return text, None, False
+
+
+_EXTRACTORS = {".pdf": _extract_pdf, ".docx": _extract_docx, ".txt": _extract_txt}
+
+
+def extract_text(name, data):
+    """Extract one file; errors come back in the result instead of raising"""
+    ext = os.path.splitext(name)[1].lower()
+    result = {"name": name, "text": "", "pages": None, "truncated": False, "error": None}
+    try:
+        text, pages, truncated = _EXTRACTORS[ext](data)
+        result.update(text=text[:MAX_CHARS], pages=pages, truncated=truncated or len(text) > MAX_CHARS)
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    return result
+
+
+# SOURCES
+def iter_files(uploads):
+    """Yield (name, bytes, error) for every supported file, unpacking ZIP archives lazily.
+
+    uploads are file-like objects with a .name (Streamlit UploadedFile works).
+    Oversized files, and ZIP members past MAX_ZIP_MEMBERS, are yielded with
+    data=None and the reason so they can be reported.
+    """
+    too_large = f"File larger than {MAX_FILE_BYTES // (1024 * 1024)} MB"
+    for upload in uploads:
+        name = upload.name
+        ext = os.path.splitext(name)[1].lower()
+        if ext == ".zip":
+            with zipfile.ZipFile(upload) as archive:
+                members = [m for m in archive.infolist() if not m.is_dir() and m.filename.lower().endswith(SUPPORTED_EXTENSIONS)]
+                for member in members[:MAX_ZIP_MEMBERS]:
+                    if member.file_size > MAX_FILE_BYTES:
+                        yield member.filename, None, too_large
+                        continue
+                    with archive.open(member) as f:
+                        # Never trust the header size: read at most the limit
+                        yield member.filename, f.read(MAX_FILE_BYTES + 1)[:MAX_FILE_BYTES], None
+                if len(members) > MAX_ZIP_MEMBERS:
+                    skipped = len(members) - MAX_ZIP_MEMBERS
+                    yield name, None, f"{skipped} files beyond the {MAX_ZIP_MEMBERS}-file limit per archive were not processed"
+        elif ext in SUPPORTED_EXTENSIONS:
+            size = getattr(upload, "size", None)
+            if size is not None and size > MAX_FILE_BYTES:
+                yield name, None, too_large
+                continue
+            upload.seek(0)
+            yield name, upload.read(MAX_FILE_BYTES + 1)[:MAX_FILE_BYTES], None
+
+
+def stream_extracted(uploads, workers=EXTRACT_WORKERS):
+    """Extract texts in a process pool, yielding each result as it completes"""
+    max_in_flight = max(1, workers) * 2
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = set()
+        for name, data, error in iter_files(uploads):
+            if data is None:
+                yield {"name": name, "text": "", "pages": None, "truncated": False, "error": error}
+                continue
+            pending.add(pool.submit(extract_text, name, data))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def stream_batches(uploads, batch_size, workers=EXTRACT_WORKERS):
+    """Group extracted files into (ok, failed) micro-batches for the analyzer"""
+    ok, failed = [], []
+    for item in stream_extracted(uploads, workers):
+        if item["error"] or not item["text"].strip():
+            item["error"] = item["error"] or "No text found"
+            failed.append(item)
+        else:
+            ok.append(item)
+        if len(ok) >= batch_size:
+            yield ok, failed
+            ok, failed = [], []
+    if ok or failed:
+        yield ok, failed
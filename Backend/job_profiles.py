@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from Backend import metrics
+from Backend.skills import REPO_DIR
+
+PROFILES_FILE = os.getenv("SKILLSENSE_PROFILES_FILE", os.path.join(REPO_DIR, "job_profiles.json"))
+EMBEDDINGS_FILE = os.getenv("SKILLSENSE_PROFILE_EMBEDDINGS_FILE", os.path.join(REPO_DIR, "job_profile_embeddings.npz"))
+SOURCES_KEY = "__sources__"
+
+
+def normalize_profile(profile):
+    """Return a clean profile dict: lowercase skills, one weight per skill"""
+    skills = [s.strip().lower() for s in profile["skills"] if s.strip()]
+    weights = {k.strip().lower(): float(v) for k, v in (profile.get("weights") or {}).items()}
+    return {
+        "role": profile["role"].strip(),
+        "skills": skills,
+        "weights": {s: weights.get(s, 1.0) for s in skills},
+        "semantic_weight": float(profile.get("semantic_weight", 1.0)),
+    }
+
+
+def profile_fingerprint(profile):
+    """Content hash of the parts of a profile that affect scoring"""
+    payload = json.dumps(
+        [profile["role"], profile["skills"], profile["weights"], profile["semantic_weight"]],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def profile_job_text(profile):
+    return ", ".join(profile["skills"])
+
+
+def weighted_coverage(profile, detected_skills):
+    """Share of the profile's skill weight covered by the detected skills (0-1)"""
+    total = sum(profile["weights"].values())
+    if not total:
+        return 0.0
+    detected = {s.lower() for s in detected_skills}
+    return sum(w for s, w in profile["weights"].items() if s in detected) / total
+
+
+class ProfileRegistry:
+    """Job profiles plus one cached requirement embedding per profile.
+
+    Embeddings are keyed by model name and profile fingerprint, so a profile
+    is only re-encoded when its role, skills or weights change. Registries
+    with different sources can share one embeddings file: it records which
+    keys each source uses, and a save only prunes keys that its own source
+    stopped using and no other source needs.
+    """
+
+    def __init__(self, profiles=(), model_name="", embeddings_file=None):
+        self.model_name = model_name
+        self.embeddings_file = embeddings_file
+        self.source_file = None
+        self._source_mtime = None
+        self._profiles = {}
+        self._embeddings = {}
+        self._lock = threading.Lock()
+        self._load_embeddings()
+        for profile in profiles:
+            self.upsert(profile)
+
+    # LOADING
+    @classmethod
+    def from_file(cls, path=PROFILES_FILE, model_name="", embeddings_file=EMBEDDINGS_FILE):
+        registry = cls(model_name=model_name, embeddings_file=embeddings_file)
+        registry.source_file = path
+        registry.refresh()
+        return registry
+
+    def refresh(self):
+        """Re-read the source file if it changed on disk"""
+        if not self.source_file or not os.path.exists(self.source_file):
+            return
+        mtime = os.path.getmtime(self.source_file)
+        if mtime == self._source_mtime:
+            return
+        with open(self.source_file, "r", encoding="utf-8") as f:
+            profiles = [normalize_profile(p) for p in json.load(f)]
+        with self._lock:
+            self._profiles = {p["role"]: p for p in profiles}
+            self._source_mtime = mtime
+
+    def upsert(self, profile):
+        profile = normalize_profile(profile)
+        with self._lock:
+            self._profiles[profile["role"]] = profile
+        return profile
+
+    # LOOKUP
+    def roles(self):
+        return list(self._profiles)
+
+    def get(self, role):
+        return self._profiles[role]
+
+    def embedding_key(self, profile):
+        return hashlib.sha1(f"{self.model_name}|{profile_fingerprint(profile)}".encode("utf-8")).hexdigest()
+
+    def embedding(self, role, encode):
+        """Requirement embedding for a role, encoding it only on first use"""
+        profile = self.get(role)
+        key = self.embedding_key(profile)
+        emb = self._embeddings.get(key)
+        metrics.cache_event("profile_embedding", emb is not None)
+        if emb is None:
+            emb = np.asarray(encode([profile_job_text(profile)]), dtype=np.float32)[0]
+            with self._lock:
+                self._embeddings[key] = emb
+                self._save_embeddings()
+        return emb
+
+    # EMBEDDING PERSISTENCE
+    def _source_tag(self):
+        return os.path.abspath(self.source_file) if self.source_file else "inline"
+
+    def _read_embeddings(self):
+        """({key: embedding}, {source: [keys]}) currently on disk"""
+        if not self.embeddings_file or not os.path.exists(self.embeddings_file):
+            return {}, {}
+        with np.load(self.embeddings_file) as data:
+            embeddings = {k: data[k] for k in data.files if k != SOURCES_KEY}
+            sources = json.loads(str(data[SOURCES_KEY])) if SOURCES_KEY in data.files else {}
+        return embeddings, sources
+
+    def _load_embeddings(self):
+        self._embeddings = self._read_embeddings()[0]
+
+    def _save_embeddings(self):
+        if not self.embeddings_file:
+            return
+        # Merge with what other registries (or processes) saved meanwhile
+        embeddings, sources = self._read_embeddings()
+        tag = self._source_tag()
+        live = {self.embedding_key(p) for p in self._profiles.values()}
+        needed = {k for source, keys in sources.items() if source != tag for k in keys}
+        for key in set(sources.get(tag, [])) - live - needed:
+            embeddings.pop(key, None)
+        embeddings.update({k: v for k, v in self._embeddings.items() if k in live})
+        sources[tag] = sorted(live)
+        directory = os.path.dirname(os.path.abspath(self.embeddings_file))
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp.npz", delete=False) as f:
+            np.savez(f, **embeddings, **{SOURCES_KEY: np.array(json.dumps(sources))})
+        os.replace(f.name, self.embeddings_file)
+        self._embeddings = embeddings
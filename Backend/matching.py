@@ -0,0 +1,130 @@
+"""Match many resumes against many job roles at once.
+
+Resumes are processed in chunks of MATCH_CHUNK_ROWS: skills are extracted,
+distinct skill sets looked up in the score table, and the chunk's resume x role score matrix is
+computed with two matrix products (semantic similarity and weighted skill
+coverage). Only the running per-role top-k and each resume's best role are
+kept, so memory does not grow with the size of the applicant pool.
+"""
+import os
+
+import numpy as np
+
+from Backend import metrics
+from Backend.ai_engine import ANALYSIS_BATCH_SIZE, MODEL_VERSION, encode_texts, load_job_profiles
+from Backend.score_table import load_score_table
+from Backend.skills import load_skill_extractor
+
+MATCH_CHUNK_ROWS = int(os.getenv("SKILLSENSE_MATCH_CHUNK_ROWS", "2048"))
+NO_SKILLS_SIMILARITY = 20.0
+
+
+def role_matrices(registry, roles, encode, extractor):
+    """Job embeddings (d x N), coverage weights (T x N) and semantic weights (N,)"""
+    index = {name.lower(): i for i, name in enumerate(extractor.skills)}
+    jobs = np.stack([registry.embedding(role, encode) for role in roles]).astype(np.float32)
+    jobs /= np.maximum(np.linalg.norm(jobs, axis=1, keepdims=True), 1e-12)
+    weights = np.zeros((len(extractor.skills), len(roles)), dtype=np.float32)
+    semantic = np.empty(len(roles), dtype=np.float32)
+    for n, role in enumerate(roles):
+        profile = registry.get(role)
+        total = sum(profile["weights"].values()) or 1.0
+        for skill, weight in profile["weights"].items():
+            if skill in index:
+                weights[index[skill], n] = weight / total
+        semantic[n] = profile["semantic_weight"]
+    return jobs.T, weights, semantic
+
+
+def _score_chunk(texts, encode, extractor, jobs, weights, semantic, batch_size):
+    """Blended scores (C x N) for one chunk of resumes, same formula as single analysis"""
+    skill_indices = [extractor.extract_indices(text) for text in texts]
+
+    # Coverage: one-hot skills x normalized profile weights
+    present = np.zeros((len(texts), weights.shape[0]), dtype=np.float32)
+    rows = np.repeat(np.arange(len(texts)), [len(idx) for idx in skill_indices])
+    present[rows, np.concatenate(skill_indices + [[]]).astype(np.int64)] = 1.0
+    coverage = present @ weights * 100
+
+    similarity = np.full((len(texts), jobs.shape[1]), NO_SKILLS_SIMILARITY, dtype=np.float32)
+    skill_sets = [tuple(idx) for idx in skill_indices]
+    unique_sets = list(dict.fromkeys(s for s in skill_sets if s))
+    if unique_sets:
+        # Normalized skill-set embeddings, encoded only on a score table miss
+        embeddings = np.stack(load_score_table(MODEL_VERSION).embeddings(unique_sets, encode, batch_size))
+        position = {s: i for i, s in enumerate(unique_sets)}
+        has_skills = np.array([bool(s) for s in skill_sets])
+        which = np.array([position[s] for s in skill_sets if s], dtype=np.int64)
+        similarity[has_skills] = (embeddings @ jobs)[which] * 100
+
+    return similarity * semantic + coverage * (1 - semantic)
+
+
+def _merge_top_k(best_scores, best_rows, scores, offset, k):
+    """Fold a chunk's (C x N) scores into the running (k x N) top-k per column"""
+    rows = np.arange(offset, offset + len(scores))[:, None].repeat(scores.shape[1], axis=1)
+    all_scores = np.concatenate([best_scores, scores])
+    all_rows = np.concatenate([best_rows, rows])
+    if len(all_scores) > k:
+        keep = np.argpartition(-all_scores, k - 1, axis=0)[:k]
+        all_scores = np.take_along_axis(all_scores, keep, axis=0)
+        all_rows = np.take_along_axis(all_rows, keep, axis=0)
+    return all_scores, all_rows
+
+
+def match_resumes(resumes, roles=None, top_k=10, chunk_rows=MATCH_CHUNK_ROWS, batch_size=ANALYSIS_BATCH_SIZE):
+    """Score every resume against every role.
+
+    resumes is any iterable of resume texts (a generator keeps memory flat).
+    Returns {"roles", "top_candidates": {role: [(resume_index, score), ...]},
+    "best_role": [(role, score), ...] per resume, "count"}. Scores use the
+    same 25-95 scale as a single analysis.
+    """
+    # The model loads only if a role or skill set misses its cache
+    encode = encode_texts
+    registry = load_job_profiles()
+    registry.refresh()
+    roles = list(roles or registry.roles())
+    extractor = load_skill_extractor()
+    jobs, weights, semantic = role_matrices(registry, roles, encode, extractor)
+
+    best_scores = np.zeros((0, len(roles)), dtype=np.float32)
+    best_rows = np.zeros((0, len(roles)), dtype=np.int64)
+    best_role, best_role_score = [], []
+    offset = 0
+
+    def flush(chunk):
+        nonlocal best_scores, best_rows, offset
+        with metrics.stage("match_chunk"):
+            scores = _score_chunk(chunk, encode, extractor, jobs, weights, semantic, batch_size)
+            best_scores, best_rows = _merge_top_k(best_scores, best_rows, scores, offset, top_k)
+            best_role.append(np.argmax(scores, axis=1))
+            best_role_score.append(scores.max(axis=1))
+        offset += len(chunk)
+
+    chunk = []
+    with metrics.stage("matching"):
+        for text in resumes:
+            chunk.append(text)
+            if len(chunk) >= chunk_rows:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+
+    def clamp(score):
+        return int(min(95, max(25, score)))
+
+    order = np.argsort(-best_scores, axis=0, kind="stable")
+    top_candidates = {
+        role: [(int(best_rows[i, n]), clamp(best_scores[i, n])) for i in order[:, n]]
+        for n, role in enumerate(roles)
+    }
+    best = np.concatenate(best_role) if best_role else np.zeros(0, dtype=np.int64)
+    best_score = np.concatenate(best_role_score) if best_role_score else np.zeros(0, dtype=np.float32)
+    return {
+        "roles": roles,
+        "count": offset,
+        "top_candidates": top_candidates,
+        "best_role": [(roles[n], clamp(s)) for n, s in zip(best.tolist(), best_score.tolist())],
+    }
@@ -0,0 +1,206 @@
+"""In-process pipeline metrics: stage timers, counters and latency histograms.
+
+Exposed as rows for the Admin page and as Prometheus text. Set
+SKILLSENSE_METRICS_PORT to also serve /metrics over HTTP for scraping.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.getenv("SKILLSENSE_METRICS_PORT", "0"))
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_help = {}
+
+
+def _key(name, labels):
+    return name, tuple(sorted((labels or {}).items()))
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Bucket-interpolated quantile, the same estimate histogram_quantile gives"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+# RECORDING
+def describe(name, text):
+    _help[name] = text
+
+
+def inc(name, labels=None, value=1):
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, labels=None):
+    with _lock:
+        key = _key(name, labels)
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(value)
+
+
+@contextmanager
+def stage(name):
+    """Time one pipeline stage; failures are counted and re-raised"""
+    start = time.monotonic()
+    try:
+        yield
+    except Exception:
+        inc("skillsense_stage_errors_total", {"stage": name})
+        raise
+    finally:
+        observe("skillsense_stage_seconds", time.monotonic() - start, {"stage": name})
+
+
+def cache_event(cache, hit, count=1):
+    if count:
+        inc("skillsense_cache_hits_total" if hit else "skillsense_cache_misses_total", {"cache": cache}, count)
+
+
+describe("skillsense_stage_seconds", "Latency of each analysis pipeline stage")
+describe("skillsense_stage_errors_total", "Exceptions raised inside a pipeline stage")
+describe("skillsense_cache_hits_total", "Cache hits by cache")
+describe("skillsense_cache_misses_total", "Cache misses by cache")
+
+
+# EXPORT
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def prometheus_text():
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(_histograms.items(), key=lambda item: item[0])
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                if name in _help:
+                    lines.append(f"# HELP {name} {_help[name]}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            if name not in seen:
+                seen.add(name)
+                if name in _help:
+                    lines.append(f"# HELP {name} {_help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+def stage_rows():
+    """One row per timed stage for the Admin page"""
+    rows = []
+    with _lock:
+        errors = {dict(labels).get("stage"): v for (name, labels), v in _counters.items() if name == "skillsense_stage_errors_total"}
+        for (name, labels), histogram in sorted(_histograms.items()):
+            if name != "skillsense_stage_seconds":
+                continue
+            stage_name = dict(labels)["stage"]
+            rows.append({
+                "Stage": stage_name,
+                "Calls": histogram.count,
+                "Errors": errors.get(stage_name, 0),
+                "Mean ms": round(histogram.sum / histogram.count * 1000, 2),
+                "p50 ms": round(histogram.quantile(0.5) * 1000, 2),
+                "p99 ms": round(histogram.quantile(0.99) * 1000, 2),
+            })
+    return rows
+
+
+def counter_rows():
+    with _lock:
+        return [
+            {"Counter": name, "Labels": _format_labels(labels), "Value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+
+
+def cache_hit_rates():
+    """{cache: hit rate} over everything recorded so far"""
+    hits, misses = {}, {}
+    with _lock:
+        for (name, labels), value in _counters.items():
+            cache = dict(labels).get("cache")
+            if name == "skillsense_cache_hits_total":
+                hits[cache] = value
+            elif name == "skillsense_cache_misses_total":
+                misses[cache] = value
+    return {c: hits.get(c, 0) / (hits.get(c, 0) + misses.get(c, 0)) for c in set(hits) | set(misses)}
+
+
+# HTTP ENDPOINT
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """Serve /metrics in a daemon thread (once per process); no-op when port is 0"""
+    global _server
+    if not port or _server is not None:
+        return _server
+    try:
+        _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    except OSError:
+        # Another Streamlit worker on this box already serves the port
+        return None
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
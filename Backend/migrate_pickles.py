@@ -0,0 +1,59 @@
+"""One-shot import of the old skillsense_*.pkl files into the database.
+
+Run with:  python -m Backend.migrate_pickles
+Imported files are renamed to *.pkl.migrated so the import never runs twice.
+"""
+import argparse
+import os
+import pickle
+from datetime import datetime
+
+from Backend.database import User, get_session
+from Backend.storage import _result_row, hash_password, init_storage
+
+USERS_FILE = "skillsense_users.pkl"
+HISTORY_FILE = "skillsense_history.pkl"
+
+
+def migrate_users(path):
+    with open(path, "rb") as f:
+        users = pickle.load(f)
+    imported = 0
+    with get_session() as db:
+        existing = {email for (email,) in db.query(User.email)}
+        for email, info in users.items():
+            if email in existing:
+                continue
+            db.add(User(email=email, password_hash=hash_password(info["password"]), role=info.get("role", "user")))
+            imported += 1
+    return imported
+
+
+def migrate_history(path):
+    with open(path, "rb") as f:
+        history = pickle.load(f)
+    with get_session() as db:
+        for result in history:
+            created_at = result.get("timestamp")
+            db.add(_result_row(result, created_at if isinstance(created_at, datetime) else None))
+    return len(history)
+
+
+def migrate_pickles(users_file=USERS_FILE, history_file=HISTORY_FILE):
+    """Import whichever pickle files exist; returns (users, history rows) imported"""
+    init_storage()
+    counts = [0, 0]
+    for i, (path, migrate) in enumerate([(users_file, migrate_users), (history_file, migrate_history)]):
+        if os.path.exists(path):
+            counts[i] = migrate(path)
+            os.replace(path, path + ".migrated")
+    return tuple(counts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import SkillSense pickle files into the database")
+    parser.add_argument("--users", default=USERS_FILE)
+    parser.add_argument("--history", default=HISTORY_FILE)
+    args = parser.parse_args()
+    users, history = migrate_pickles(args.users, args.history)
+    print(f"Imported {users} users and {history} history rows")
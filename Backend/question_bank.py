@@ -0,0 +1,182 @@
+"""Tagged interview question bank with pre-computed embeddings.
+
+question_bank.json holds technical questions, behavioral questions and
+assessment tasks, each tagged with taxonomy skills (or competencies). Every
+item is embedded once into one normalized matrix, cached on disk per model
+and bank content. Retrieval is one top-k dot product over the item's kind,
+narrowed by IVF lists once a kind passes IVF_MIN_ITEMS, with a boost for
+items tagged with the query's skills and near-duplicates dropped.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from Backend import metrics
+from Backend.embedding_index import train_ivf
+from Backend.skills import REPO_DIR
+
+QUESTION_BANK_FILE = os.getenv("SKILLSENSE_QUESTION_BANK_FILE", os.path.join(REPO_DIR, "question_bank.json"))
+QUESTION_EMBEDDINGS_FILE = os.getenv("SKILLSENSE_QUESTION_EMBEDDINGS_FILE", os.path.join(REPO_DIR, "question_bank_embeddings.npz"))
+IVF_MIN_ITEMS = int(os.getenv("SKILLSENSE_QUESTION_IVF_MIN_ITEMS", "4096"))
+IVF_NPROBE = int(os.getenv("SKILLSENSE_QUESTION_IVF_NPROBE", "6"))
+TAG_BOOST = 0.15
+DEDUPE_THRESHOLD = 0.92
+
+KINDS = ["technical", "behavioral", "task"]
+
+
+def item_text(item):
+    """Text embedded for an item: its tags, then the question itself"""
+    return f"{', '.join(item['tags'])}: {item['text']}"
+
+
+def _normalize_text(text):
+    return " ".join(text.lower().split())
+
+
+class QuestionBank:
+    """Items grouped by kind, with tag postings and one embedding matrix"""
+
+    def __init__(self, items, model_name="", embeddings_file=None):
+        # Group by kind so every kind is one contiguous slice of the matrix
+        self.items = sorted(items, key=lambda item: KINDS.index(item["type"]))
+        self.model_name = model_name
+        self.embeddings_file = embeddings_file
+        self.matrix = None
+        self._ivf = {}
+        self._cache_key = None
+        self._lock = threading.Lock()
+
+        self.kind_ranges = {}
+        for kind in KINDS:
+            rows = [i for i, item in enumerate(self.items) if item["type"] == kind]
+            self.kind_ranges[kind] = (rows[0], rows[-1] + 1) if rows else (0, 0)
+        postings = {}
+        for i, item in enumerate(self.items):
+            for tag in item["tags"]:
+                postings.setdefault(tag.lower(), []).append(i)
+        self.postings = {tag: np.array(rows, dtype=np.int64) for tag, rows in postings.items()}
+
+    @classmethod
+    def from_file(cls, path=QUESTION_BANK_FILE, model_name="", embeddings_file=QUESTION_EMBEDDINGS_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), model_name=model_name, embeddings_file=embeddings_file)
+
+    def __len__(self):
+        return len(self.items)
+
+    def cache_key(self):
+        if self._cache_key is None:
+            payload = json.dumps([self.model_name, [item_text(item) for item in self.items]])
+            self._cache_key = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return self._cache_key
+
+    # EMBEDDINGS
+    def ensure_embeddings(self, encode, batch_size=64):
+        """Load the item matrix from disk, or encode every item once and save it"""
+        if self.matrix is not None:
+            return self.matrix
+        with self._lock:
+            if self.matrix is not None:
+                return self.matrix
+            key = self.cache_key()
+            matrix = self._load(key)
+            metrics.cache_event("question_bank", matrix is not None)
+            if matrix is None:
+                with metrics.stage("question_bank_encode"):
+                    matrix = np.asarray(encode([item_text(item) for item in self.items], batch_size=batch_size), dtype=np.float32)
+                matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+                self._save(key, matrix)
+            self._build_ivf(matrix)
+            self.matrix = matrix
+        return self.matrix
+
+    def _load(self, key):
+        if not self.embeddings_file or not os.path.exists(self.embeddings_file):
+            return None
+        with np.load(self.embeddings_file) as data:
+            if str(data["key"]) != key or len(data["matrix"]) != len(self.items):
+                return None
+            return data["matrix"]
+
+    def _save(self, key, matrix):
+        if not self.embeddings_file:
+            return
+        directory = os.path.dirname(os.path.abspath(self.embeddings_file))
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp.npz", delete=False) as f:
+            np.savez(f, key=key, matrix=matrix)
+        os.replace(f.name, self.embeddings_file)
+
+    def _build_ivf(self, matrix):
+        # IVF lists per kind, each list's rows copied into one contiguous block
+        # so probing is a few slice products instead of a gather
+        for kind, (start, end) in self.kind_ranges.items():
+            if end - start >= IVF_MIN_ITEMS:
+                centroids, order, offsets = train_ivf(matrix[start:end])
+                rows = order + start
+                self._ivf[kind] = (centroids, rows, offsets, np.ascontiguousarray(matrix[rows]))
+
+    # RETRIEVAL
+    def _tag_rows(self, tags, start, end):
+        rows = [self.postings[t] for t in {t.lower() for t in tags} if t in self.postings]
+        if not rows:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.concatenate(rows)
+        return rows[(rows >= start) & (rows < end)]
+
+    def retrieve(self, kind, k=5, query=None, tags=()):
+        """Top-k distinct items of one kind for a query embedding and/or skill tags"""
+        start, end = self.kind_ranges[kind]
+        if end == start or k <= 0:
+            return []
+        tag_rows = self._tag_rows(tags, start, end)
+
+        if query is None or self.matrix is None:
+            # No embedding available: tagged items first (most matching tags
+            # first), then topped up with items spread across the whole kind
+            rows, counts = np.unique(tag_rows, return_counts=True)
+            grid = np.unique(np.linspace(start, end - 1, min(end - start, k * 4)).astype(np.int64))
+            spread = np.concatenate([grid[i::4] for i in range(4)])
+            return self._dedupe(np.concatenate([rows[np.argsort(-counts, kind="stable")], spread]), None, k)
+
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        query = query / max(np.linalg.norm(query), 1e-12)
+        ivf = self._ivf.get(kind)
+        if ivf is None:
+            rows = np.arange(start, end)
+            scores = self.matrix[start:end] @ query
+        else:
+            centroids, list_rows, offsets, blocks = ivf
+            probes = np.argpartition(-(centroids @ query), min(IVF_NPROBE, len(centroids)) - 1)[:IVF_NPROBE]
+            spans = [(offsets[p], offsets[p + 1]) for p in probes]
+            # Tagged rows are always scored, even outside the probed lists
+            rows = np.concatenate([list_rows[a:b] for a, b in spans] + [tag_rows])
+            scores = np.concatenate([blocks[a:b] @ query for a, b in spans] + [self.matrix[tag_rows] @ query])
+        if len(tag_rows):
+            tagged = np.zeros(end, dtype=bool)
+            tagged[tag_rows] = True
+            scores = scores + TAG_BOOST * tagged[rows]
+
+        take = min(len(rows), k * 4)
+        top = np.argpartition(-scores, take - 1)[:take]
+        return self._dedupe(rows[top[np.argsort(-scores[top])]], query, k)
+
+    def _dedupe(self, rows, query, k):
+        """First k rows (in ranked order) that are not the same or a near-copy of a kept one"""
+        picked, seen_texts = [], set()
+        for row in rows:
+            text = _normalize_text(self.items[row]["text"])
+            if text in seen_texts:
+                continue
+            if picked and self.matrix is not None and query is not None:
+                if np.max(self.matrix[picked] @ self.matrix[row]) > DEDUPE_THRESHOLD:
+                    continue
+            picked.append(int(row))
+            seen_texts.add(text)
+            if len(picked) == k:
+                break
+        return [self.items[row] for row in picked]
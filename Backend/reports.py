@@ -0,0 +1,210 @@
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+
+from Backend import metrics
+
+PDF_CACHE_SIZE = int(os.getenv("SKILLSENSE_PDF_CACHE_SIZE", "64"))
+EXPORT_WORKERS = int(os.getenv("SKILLSENSE_EXPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# STYLES (built once per process, shared by every report)
+STYLES = getSampleStyleSheet()
+
+CANDIDATE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
+    ('FONTNAME', (0, 0), (0, 0), 'Helvetica-Bold'),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTSIZE', (0, 0), (-1, -1), 12)
+])
+
+
+def _decision_table_style(row_color):
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 14),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('BACKGROUND', (0, 1), (-1, -1), row_color),
+        ('GRID', (0, 0), (-1, -1), 2, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 12)
+    ])
+
+
+DECISION_TABLE_STYLE_PASS = _decision_table_style(colors.lightgreen)
+DECISION_TABLE_STYLE_FAIL = _decision_table_style(colors.lightcoral)
+
+SKILLS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.ivory),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.darkgreen),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
+])
+
+FOOTER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+# PDF BUILD
+def build_hiring_pdf(results):
+    """Render the report from scratch; use render_hiring_pdf for the cached path"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36)
+    styles = STYLES
+    story = []
+    
+    # HEADER
+    story.append(Paragraph("SkillSense AI - Resume Analysis Report", styles['Title']))
+    story.append(Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y %I:%M %p')}", styles['Normal']))
+    story.append(Spacer(1, 20))
+    
+    # CANDIDATE INFO TABLE
+    candidate_data = [["Candidate Name:", results['candidate']], 
+                     ["Position Level:", results.get('level', 'N/A')],
+                     ["Analysis Date:", datetime.now().strftime('%Y-%m-%d')]]
+    
+    candidate_table = Table(candidate_data, colWidths=[2*inch, 3.5*inch])
+    candidate_table.setStyle(CANDIDATE_TABLE_STYLE)
+    story.extend([candidate_table, Spacer(1, 20)])
+    
+    # MAIN DECISION TABLE
+    ai_score = results.get('ai_score', 0)
+    decision_data = [
+        ["Metric", "Status", "Score"],
+        ["Hiring Decision", results.get('recommendation', 'N/A'), f"{ai_score}%"],
+        ["Skill Match", f"{len(results.get('detected_skills', []))} Skills"],
+        ["AI Recommendation", results.get('job_fit', 'N/A')]
+    ]
+    
+    decision_table = Table(decision_data, colWidths=[1.8*inch, 2.2*inch, 1.8*inch])
+    decision_table.setStyle(DECISION_TABLE_STYLE_PASS if ai_score > 70 else DECISION_TABLE_STYLE_FAIL)
+    
+    story.extend([Paragraph("AI-ENHANCED HIRING DECISION", styles['Heading1']), 
+                 Spacer(1, 12), decision_table, Spacer(1, 20)])
+    
+    # SKILLS GRID
+    all_skills = results.get('detected_skills', [])
+    story.append(Paragraph("DETECTED TECHNICAL SKILLS", styles['Heading2']))
+    if all_skills:
+        skills_data = []
+        for i in range(0, len(all_skills), 2):
+            row = [all_skills[i]]
+            if i+1 < len(all_skills):
+                row.append(all_skills[i+1])
+            skills_data.append(row)
+        
+        skills_table = Table(skills_data, colWidths=[3*inch, 3*inch])
+        skills_table.setStyle(SKILLS_TABLE_STYLE)
+        story.append(skills_table)
+    story.append(Spacer(1, 20))
+    
+    # INTERVIEW QUESTIONS
+    questions = results.get('interview_questions', [])
+    if questions:
+        story.append(Paragraph("INTERVIEW QUESTIONS", styles['Heading2']))
+        for i, question in enumerate(questions[:6], 1):
+            story.append(Paragraph(f"{i}. {question}", styles['Normal']))
+            story.append(Spacer(1, 8))
+    
+    # ANALYSIS
+    story.append(Paragraph("DETAILED AI ANALYSIS", styles['Heading2']))
+    analysis_para = Paragraph(f"""
+    <b>AI Score:</b> {ai_score}% semantic match using HuggingFace Transformers<br/>
+    <b>Skills Found:</b> {len(all_skills)} technical skills detected<br/>
+    <b>Position Fit:</b> {results.get('level', 'N/A')} level position<br/>
+    <b>Recommendation:</b> {results.get('recommendation', 'N/A')}<br/><br/>
+    
+    <b>Powered by:</b> SkillSense AI + HuggingFace AI
+    """, styles['Normal'])
+    story.append(analysis_para)
+    
+    # FOOTER
+    story.append(Spacer(1, 20))
+    footer_data = [["Generated by:", "SkillSense AI Enterprise + HuggingFace AI"], 
+                  ["Report ID:", f"SSAI-{datetime.now().strftime('%Y%m%d%H%M')}"]]
+    footer_table = Table(footer_data, colWidths=[2*inch, 3.5*inch])
+    footer_table.setStyle(FOOTER_TABLE_STYLE)
+    story.append(footer_table)
+    
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+# CACHED RENDERING
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
+
+def results_hash(results):
+    """Stable hash of a results dict (key order and datetimes normalized)"""
+    payload = json.dumps(results, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_hiring_pdf(results):
+    """PDF bytes for a results dict, rebuilt only when the results change"""
+    key = results_hash(results)
+    with _pdf_cache_lock:
+        if key in _pdf_cache:
+            _pdf_cache.move_to_end(key)
+            metrics.cache_event("pdf", True)
+            return _pdf_cache[key]
+    metrics.cache_event("pdf", False)
+    with metrics.stage("pdf_build"):
+        pdf = build_hiring_pdf(results).getvalue()
+    with _pdf_cache_lock:
+        _pdf_cache[key] = pdf
+        while len(_pdf_cache) > PDF_CACHE_SIZE:
+            _pdf_cache.popitem(last=False)
+    return pdf
+
+
+# BULK EXPORT
+def report_filename(results, index=None):
+    name = re.sub(r"[^A-Za-z0-9_-]+", "_", str(results.get('candidate') or 'Candidate')).strip("_")
+    prefix = f"{index:04d}_" if index is not None else ""
+    return f"{prefix}SkillSense_AI_Report_{name}.pdf"
+
+
+def export_reports_zip(results_list, workers=EXPORT_WORKERS):
+    """Render reports in a process pool and stream them into a ZIP on disk.
+
+    At most workers * 2 PDFs are in flight, and each one is written to the
+    archive and dropped as soon as it is ready. Returns an open temp file
+    positioned at the start of the ZIP; it is deleted when closed.
+    """
+    out = tempfile.TemporaryFile(suffix=".zip")
+    max_in_flight = max(1, workers) * 2
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as archive, \
+            ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = []
+        for i, results in enumerate(results_list, 1):
+            pending.append((report_filename(results, i), pool.submit(render_hiring_pdf, results)))
+            if len(pending) >= max_in_flight:
+                name, future = pending.pop(0)
+                archive.writestr(name, future.result())
+        for name, future in pending:
+            archive.writestr(name, future.result())
+    out.seek(0)
+    return out
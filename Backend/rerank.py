@@ -0,0 +1,253 @@
+"""Re-score stored candidates after a job profile changes.
+
+Every history row keeps its full skill set, how it was scored and the
+fingerprint of the profile it was scored against; its skill embedding is
+already in the embedding index (or the score table). When a profile's
+skills, weights or semantic weight change, only skills-scored rows with a
+stale fingerprint are re-scored, in chunks of RERANK_CHUNK_ROWS: coverage
+is one matrix product over the one-hot skill sets and similarity one
+product with the new job embedding, using the same formula as a fresh
+analysis. No resume text is re-read or re-encoded, new scores are written
+back with one bulk UPDATE per chunk, and the history store rewrites only
+the segments holding those rows.
+
+Rows scored in chunks mode need their resume text and are left for
+re-analysis. Rows saved before profile fingerprints were recorded are
+never treated as outdated; an admin can re-score them explicitly from the
+skills they kept.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy import func, or_, select, update
+
+from Backend import metrics
+from Backend.ai_engine import MODEL_VERSION, encode_texts, load_embedding_index, load_job_profiles
+from Backend.database import CandidateResult, get_session
+from Backend.history_store import HISTORY_DIR, load_history_store
+from Backend.job_profiles import profile_fingerprint
+from Backend.matching import NO_SKILLS_SIMILARITY, role_matrices
+from Backend.score_table import load_score_table
+from Backend.skills import load_skill_extractor
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer deployments only
+    fcntl = None
+
+RERANK_CHUNK_ROWS = int(os.getenv("SKILLSENSE_RERANK_CHUNK_ROWS", "5000"))
+RERANK_LOCK_FILE = os.path.join(HISTORY_DIR, ".rerank.lock")
+
+_lock = threading.Lock()
+_status = {"state": "idle", "role": None, "done": 0, "total": 0, "error": None, "started": None, "finished": None}
+_thread = None
+_seen_fingerprints = None
+
+logger = logging.getLogger(__name__)
+
+
+class RerankBusy(RuntimeError):
+    """Another process holds the re-rank lock"""
+
+
+@contextmanager
+def _rerank_lock():
+    # One re-rank at a time across every Streamlit process sharing the store
+    os.makedirs(os.path.dirname(RERANK_LOCK_FILE) or ".", exist_ok=True)
+    with open(RERANK_LOCK_FILE, "a") as lock_file:
+        if fcntl:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RerankBusy("Another process is already re-ranking") from None
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _rescorable(role, fingerprint, unversioned=False):
+    """Rows of a role that can be re-scored from their stored skills"""
+    stale = (
+        CandidateResult.profile_fingerprint.is_not(None)
+        & (CandidateResult.profile_fingerprint != fingerprint)
+        & (CandidateResult.scoring_mode == "skills")
+    )
+    if unversioned:
+        stale = or_(stale, CandidateResult.profile_fingerprint.is_(None))
+    return (CandidateResult.jd_title == role) & stale
+
+
+def outdated_counts():
+    """{role: {"candidates", "outdated", "reanalyze", "unversioned"}} row counts.
+
+    outdated rows are re-ranked automatically; reanalyze rows were scored
+    against an older profile in chunks mode and need their resume text;
+    unversioned rows predate profile fingerprints.
+    """
+    registry = load_job_profiles()
+    registry.refresh()
+    current = {role: profile_fingerprint(registry.get(role)) for role in registry.roles()}
+    counts = {role: dict.fromkeys(["candidates", "outdated", "reanalyze", "unversioned"], 0) for role in current}
+    with get_session() as db:
+        rows = db.execute(
+            select(CandidateResult.jd_title, CandidateResult.profile_fingerprint, CandidateResult.scoring_mode,
+                   func.count(CandidateResult.id))
+            .where(CandidateResult.jd_title.in_(list(current)))
+            .group_by(CandidateResult.jd_title, CandidateResult.profile_fingerprint, CandidateResult.scoring_mode)
+        ).all()
+    for role, fingerprint, scoring_mode, count in rows:
+        counts[role]["candidates"] += count
+        if fingerprint is None:
+            counts[role]["unversioned"] += count
+        elif fingerprint != current[role]:
+            counts[role]["outdated" if scoring_mode == "skills" else "reanalyze"] += count
+    return counts
+
+
+def _score_rows(rows, extractor, job, weights, semantic_weight):
+    """New (score, recommendation) arrays for (id, all_skills, skills) rows"""
+    index = {name: i for i, name in enumerate(extractor.skills)}
+    skill_sets = []
+    for _, all_skills, skills in rows:
+        # Rows saved before all_skills existed only kept their top 8 skills
+        names = (all_skills if all_skills is not None else skills or "").split(", ")
+        skill_sets.append(tuple(sorted(index[n] for n in names if n in index)))
+
+    present = np.zeros((len(rows), len(extractor.skills)), dtype=np.float32)
+    row_index = np.repeat(np.arange(len(rows)), [len(s) for s in skill_sets])
+    present[row_index, np.concatenate([s for s in skill_sets] + [()]).astype(np.int64)] = 1.0
+    coverage = present @ weights * 100
+
+    has_skills = np.array([bool(s) for s in skill_sets])
+    embeddings, found = load_embedding_index().vectors([row[0] for row in rows])
+    if not embeddings.shape[1]:
+        embeddings = np.zeros((len(rows), len(job)), dtype=np.float32)
+    # Skill sets missing from the index come from the score table (skill text only)
+    missing = np.flatnonzero(has_skills & ~found)
+    if len(missing):
+        vectors = load_score_table(MODEL_VERSION).embeddings([skill_sets[i] for i in missing], encode_texts)
+        embeddings[missing] = np.stack(vectors)
+    similarity = np.where(has_skills, embeddings @ job * 100, NO_SKILLS_SIMILARITY)
+
+    scores = np.clip(np.floor(similarity * semantic_weight + coverage * (1 - semantic_weight)), 25, 95).astype(int)
+    recommendations = np.where(scores > 75, "HIRE", np.where(scores > 50, "INTERVIEW", "REVIEW"))
+    return scores, recommendations
+
+
+def rerank(roles=None, unversioned=False, chunk_rows=RERANK_CHUNK_ROWS, progress=None):
+    """Re-score outdated candidates; returns the number of rows updated.
+
+    unversioned=True also re-scores rows saved before profile fingerprints
+    were recorded. progress(role, done, total) is called after every chunk.
+    Raises RerankBusy when another process is re-ranking.
+    """
+    with _rerank_lock():
+        registry = load_job_profiles()
+        registry.refresh()
+        counts = outdated_counts()
+        wanted = {role: c["outdated"] + (c["unversioned"] if unversioned else 0) for role, c in counts.items()}
+        roles = [role for role in (roles or registry.roles()) if wanted.get(role)]
+        total = sum(wanted[role] for role in roles)
+        extractor = load_skill_extractor()
+        done = 0
+        changed = {}
+        if progress:
+            progress(None, 0, total)
+        for role in roles:
+            profile = registry.get(role)
+            fingerprint = profile_fingerprint(profile)
+            jobs, weights, semantic = role_matrices(registry, [role], encode_texts, extractor)
+            last_id = 0
+            while True:
+                with get_session() as db:
+                    rows = db.execute(
+                        select(CandidateResult.id, CandidateResult.all_skills, CandidateResult.skills)
+                        .where(_rescorable(role, fingerprint, unversioned), CandidateResult.id > last_id)
+                        .order_by(CandidateResult.id)
+                        .limit(chunk_rows)
+                    ).all()
+                    if not rows:
+                        break
+                    with metrics.stage("rerank_chunk"):
+                        scores, recommendations = _score_rows(rows, extractor, jobs[:, 0], weights[:, 0], float(semantic[0]))
+                        db.execute(update(CandidateResult), [
+                            {"id": row[0], "total_score": int(score), "recommendation": str(recommendation),
+                             "profile_fingerprint": fingerprint}
+                            for row, score, recommendation in zip(rows, scores, recommendations)
+                        ])
+                for row, score, recommendation in zip(rows, scores, recommendations):
+                    changed[row[0]] = (int(score), str(recommendation))
+                last_id = rows[-1][0]
+                done += len(rows)
+                metrics.inc("skillsense_reranked_total", value=len(rows))
+                if progress:
+                    progress(role, done, total)
+        # The History page reads the columnar copy: rewrite just the segments holding these rows
+        with metrics.stage("rerank_history_update"):
+            load_history_store().update_scores(changed)
+    return done
+
+
+# BACKGROUND JOB
+def rerank_status():
+    with _lock:
+        return dict(_status)
+
+
+def _run(roles, unversioned):
+    def progress(role, done, total):
+        with _lock:
+            _status.update(role=role, done=done, total=total)
+
+    try:
+        rerank(roles, unversioned, progress=progress)
+        with _lock:
+            _status.update(state="done", role=None, finished=time.time())
+    except RerankBusy as exc:
+        with _lock:
+            _status.update(state="busy", error=str(exc), finished=time.time())
+    except Exception as exc:
+        logger.exception("Re-ranking failed")
+        with _lock:
+            _status.update(state="failed", error=f"{type(exc).__name__}: {exc}", finished=time.time())
+
+
+def start_rerank(roles=None, unversioned=False):
+    """Re-rank in a daemon thread; False if a re-rank is already running here"""
+    global _thread
+    with _lock:
+        if _status["state"] == "running":
+            return False
+        _status.update(state="running", role=None, done=0, total=0, error=None, started=time.time(), finished=None)
+        _thread = threading.Thread(target=_run, args=(roles, unversioned), name="rerank", daemon=True)
+    _thread.start()
+    return True
+
+
+def maybe_start_rerank():
+    """Start a background re-rank when any profile changed since the last check.
+
+    Cheap enough to call on every page load: the database is only queried
+    once per process and then again after a profile edit. When several
+    processes notice the same edit, the re-rank lock lets one of them run
+    it and the others report "busy".
+    """
+    global _seen_fingerprints
+    registry = load_job_profiles()
+    registry.refresh()
+    current = {role: profile_fingerprint(registry.get(role)) for role in registry.roles()}
+    with _lock:
+        if current == _seen_fingerprints:
+            return False
+        _seen_fingerprints = current
+    roles = [role for role, counts in outdated_counts().items() if counts["outdated"]]
+    return start_rerank(roles) if roles else False
+
+
+metrics.describe("skillsense_reranked_total", "Stored candidates re-scored after a profile change")
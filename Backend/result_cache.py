@@ -0,0 +1,151 @@
+"""Persistent cache of full analysis results.
+
+Keyed by a hash of the normalized resume text, the job profile, the
+model/backend version and everything else that changes a result, so a
+resubmitted resume skips extraction and encoding entirely. Entries live in
+one SQLite file (WAL, safe for several Streamlit workers) and the least
+recently used ones are evicted once the cache passes its byte budget.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from Backend import metrics
+
+RESULT_CACHE_FILE = os.getenv("SKILLSENSE_RESULT_CACHE_FILE", "analysis_cache.db")
+RESULT_CACHE_MB = float(os.getenv("SKILLSENSE_RESULT_CACHE_MB", "256"))
+SQL_BATCH = 500
+
+
+def normalize_resume(text):
+    return " ".join(text.split())
+
+
+def result_key(resume_text, *parts):
+    """Content address of one analysis: resume text plus every input that affects it"""
+    payload = json.dumps([normalize_resume(resume_text), *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """LRU key -> (result dict, embedding) store bounded by max_bytes"""
+
+    def __init__(self, path=RESULT_CACHE_FILE, max_bytes=int(RESULT_CACHE_MB * 1024 * 1024)):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, embedding BLOB, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS ix_results_last_used ON results (last_used)")
+            db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            db.executemany(
+                "INSERT OR IGNORE INTO stats (name, value) VALUES (?, 0)", [("bytes",), ("hits",), ("misses",)]
+            )
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # LOOKUP
+    def get_many(self, keys):
+        """{key: (result, embedding or None)} for cached keys; hits are marked as recently used"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        db = self._connect()
+        for start in range(0, len(keys), SQL_BATCH):
+            batch = keys[start:start + SQL_BATCH]
+            rows = db.execute(
+                f"SELECT key, result, embedding FROM results WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            for key, result, embedding in rows:
+                found[key] = (
+                    json.loads(result),
+                    None if embedding is None else np.frombuffer(embedding, dtype=np.float32).copy(),
+                )
+        now = time.time()
+        with db:
+            db.executemany("UPDATE results SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+            db.execute("UPDATE stats SET value = value + ? WHERE name = 'hits'", (len(found),))
+            db.execute("UPDATE stats SET value = value + ? WHERE name = 'misses'", (len(keys) - len(found),))
+        metrics.cache_event("analysis_result", True, len(found))
+        metrics.cache_event("analysis_result", False, len(keys) - len(found))
+        return found
+
+    # WRITING
+    def put_many(self, items):
+        """Store (key, result, embedding) triples, then evict down to the byte budget"""
+        rows = []
+        for key, result, embedding in items:
+            payload = json.dumps(result, default=str)
+            blob = None if embedding is None else np.asarray(embedding, dtype=np.float32).tobytes()
+            rows.append((key, payload, blob, len(payload) + len(blob or b"") + len(key)))
+        if not rows:
+            return
+        now = time.time()
+        db = self._connect()
+        with db:
+            for key, payload, blob, size in rows:
+                old = db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, result, embedding, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, blob, size, now),
+                )
+                db.execute("UPDATE stats SET value = value + ? WHERE name = 'bytes'", (size - (old[0] if old else 0),))
+            self._evict(db)
+
+    def _evict(self, db):
+        total = db.execute("SELECT value FROM stats WHERE name = 'bytes'").fetchone()[0]
+        while total > self.max_bytes:
+            victims = db.execute(
+                "SELECT key, size FROM results ORDER BY last_used LIMIT ?", (SQL_BATCH,)
+            ).fetchall()
+            if not victims:
+                break
+            freed, evicted = 0, []
+            for key, size in victims:
+                if total - freed <= self.max_bytes:
+                    break
+                freed += size
+                evicted.append((key,))
+            db.executemany("DELETE FROM results WHERE key = ?", evicted)
+            db.execute("UPDATE stats SET value = value - ? WHERE name = 'bytes'", (freed,))
+            metrics.inc("skillsense_cache_evictions_total", {"cache": "analysis_result"}, len(evicted))
+            total -= freed
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute("DELETE FROM results")
+            db.execute("UPDATE stats SET value = 0")
+
+    def stats(self):
+        """Entries, bytes and all-time hits/misses across every process sharing the file"""
+        db = self._connect()
+        stats = dict(db.execute("SELECT name, value FROM stats").fetchall())
+        stats["entries"] = db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+metrics.describe("skillsense_cache_evictions_total", "Entries evicted from a size-bounded cache")
+
+
+@lru_cache(maxsize=None)
+def load_result_cache():
+    """The process-wide cache, or None when SKILLSENSE_RESULT_CACHE_MB is 0"""
+    if RESULT_CACHE_MB <= 0:
+        return None
+    return ResultCache()
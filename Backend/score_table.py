@@ -0,0 +1,193 @@
+"""Skill-set score table over the closed taxonomy vocabulary.
+
+The encoder only ever sees ", ".join(detected_skills) with the skills in
+taxonomy order, so a skill set fully determines its embedding. The table
+stores that embedding once per skill set, keyed by a bitmask over the
+taxonomy, in a SQLite file; a job score is then one dot product with the
+profile embedding. Small vocabularies are enumerated ahead of time; the
+real taxonomy is far too large for that, so entries are added on first
+miss and the common analysis path needs no model inference.
+
+Build or warm it ahead of time with:
+    python -m Backend.score_table build [--resumes DIR]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+from Backend import metrics
+from Backend.skills import load_skill_extractor
+
+SCORE_TABLE_FILE = os.getenv("SKILLSENSE_SCORE_TABLE_FILE", "skill_score_table.db")
+SCORE_TABLE_MAX_COMBOS = int(os.getenv("SKILLSENSE_SCORE_TABLE_MAX_COMBOS", "65536"))
+SQL_BATCH = 500
+
+
+def skill_text(skills):
+    """Exactly what the encoder sees for a skill set"""
+    return ", ".join(skills)
+
+
+class SkillScoreTable:
+    """Bitmask -> float16 skill-set embedding, shared across processes"""
+
+    def __init__(self, skills, path=SCORE_TABLE_FILE, model_name=""):
+        self.skills = list(skills)
+        self.path = path
+        self.model_name = model_name
+        # Rows are only valid for one model and one vocabulary order
+        payload = json.dumps([model_name, self.skills])
+        self.space = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS skill_sets ("
+                "space TEXT NOT NULL, mask BLOB NOT NULL, vector BLOB NOT NULL, PRIMARY KEY (space, mask))"
+            )
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def mask(self, indices):
+        """Packed bitmask of a set of taxonomy indices"""
+        bits = np.zeros(len(self.skills), dtype=np.uint8)
+        bits[list(indices)] = 1
+        return np.packbits(bits).tobytes()
+
+    def enumerable(self):
+        return 2 ** len(self.skills) - 1 <= SCORE_TABLE_MAX_COMBOS
+
+    # LOOKUP
+    def get_many(self, masks):
+        """{mask: float32 embedding} for the skill sets already in the table"""
+        found = {}
+        db = self._connect()
+        masks = list(masks)
+        for start in range(0, len(masks), SQL_BATCH):
+            batch = masks[start:start + SQL_BATCH]
+            rows = db.execute(
+                f"SELECT mask, vector FROM skill_sets WHERE space = ? AND mask IN ({','.join('?' * len(batch))})",
+                [self.space, *batch],
+            ).fetchall()
+            for mask, blob in rows:
+                found[mask] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return found
+
+    def embeddings(self, skill_sets, encode, batch_size=64):
+        """Normalized embedding per non-empty index set, encoding only missing sets"""
+        masks = [self.mask(indices) for indices in skill_sets]
+        vectors = self.get_many(set(masks))
+        missing = {}
+        for mask, indices in zip(masks, skill_sets):
+            if mask not in vectors:
+                missing.setdefault(mask, indices)
+        misses = sum(1 for m in masks if m in missing)
+        metrics.cache_event("skill_score_table", True, len(masks) - misses)
+        metrics.cache_event("skill_score_table", False, misses)
+        if missing:
+            texts = [skill_text(self.skills[i] for i in sorted(indices)) for indices in missing.values()]
+            with metrics.stage("encode"):
+                encoded = np.asarray(encode(texts, batch_size=batch_size), dtype=np.float32)
+            vectors.update(self._store(list(missing), encoded))
+        return [vectors[m] for m in masks]
+
+    def _store(self, masks, encoded):
+        """Normalize and store fresh embeddings; returns them as they will be read back"""
+        encoded = encoded / np.maximum(np.linalg.norm(encoded, axis=1, keepdims=True), 1e-12)
+        # Round through float16 like the stored copy, so cached and fresh scores agree
+        encoded = encoded.astype(np.float16)
+        with self._connect() as db:
+            db.executemany(
+                "INSERT OR IGNORE INTO skill_sets (space, mask, vector) VALUES (?, ?, ?)",
+                [(self.space, mask, vector.tobytes()) for mask, vector in zip(masks, encoded)],
+            )
+        return dict(zip(masks, encoded.astype(np.float32)))
+
+    # BUILDING
+    def precompute(self, encode, batch_size=256):
+        """Enumerate every skill combination when the vocabulary is small enough.
+
+        Returns the number of sets encoded; 0 when the vocabulary is too
+        large, in which case the table fills on first miss instead.
+        """
+        if not self.enumerable():
+            return 0
+        added = 0
+        batch = []
+        for size in range(1, len(self.skills) + 1):
+            for indices in combinations(range(len(self.skills)), size):
+                batch.append(indices)
+                if len(batch) >= batch_size:
+                    added += self._precompute_batch(batch, encode, batch_size)
+                    batch = []
+        if batch:
+            added += self._precompute_batch(batch, encode, batch_size)
+        return added
+
+    def _precompute_batch(self, skill_sets, encode, batch_size):
+        masks = [self.mask(indices) for indices in skill_sets]
+        known = self.get_many(masks)
+        todo = [(m, s) for m, s in zip(masks, skill_sets) if m not in known]
+        if todo:
+            encoded = encode([skill_text(self.skills[i] for i in s) for _, s in todo], batch_size=batch_size)
+            self._store([m for m, _ in todo], np.asarray(encoded, dtype=np.float32))
+        return len(todo)
+
+    def complete(self):
+        """True when every skill set is stored, so no lookup can miss"""
+        return self.enumerable() and self.count() == 2 ** len(self.skills) - 1
+
+    def count(self):
+        db = self._connect()
+        return db.execute("SELECT COUNT(*) FROM skill_sets WHERE space = ?", (self.space,)).fetchone()[0]
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute("DELETE FROM skill_sets")
+
+
+@lru_cache(maxsize=None)
+def load_score_table(model_name=""):
+    return SkillScoreTable(load_skill_extractor().skills, model_name=model_name)
+
+
+if __name__ == "__main__":
+    from Backend.ai_engine import MODEL_VERSION, load_ai_model
+
+    parser = argparse.ArgumentParser(description="SkillSense skill-set score table")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--resumes", metavar="DIR", help="also add the skill sets found in these resume files")
+    args = parser.parse_args()
+
+    table = load_score_table(MODEL_VERSION)
+    encode = load_ai_model().encode
+    if table.enumerable():
+        print(f"Encoded {table.precompute(encode)} skill combinations")
+    else:
+        print(f"{len(table.skills)} skills: too many to enumerate, the table fills on first miss")
+    if args.resumes:
+        from Backend.ingest import extract_text
+
+        skill_sets = []
+        for entry in sorted(os.scandir(args.resumes), key=lambda e: e.name):
+            if entry.is_file():
+                with open(entry.path, "rb") as f:
+                    indices = load_skill_extractor().extract_indices(extract_text(entry.name, f.read())["text"])
+                if indices:
+                    skill_sets.append(indices)
+        table.embeddings(skill_sets, encode)
+        print(f"Warmed {len(skill_sets)} resumes")
+    print(f"{table.count()} skill sets in {table.path}")
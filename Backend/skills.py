@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import re
+from collections import deque
+from functools import lru_cache
+
+# Shipped data files live in the repository root, wherever the process starts
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TAXONOMY_FILE = os.getenv("SKILLSENSE_TAXONOMY_FILE", os.path.join(REPO_DIR, "skills_taxonomy.json"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class SkillExtractor:
+    """Finds every taxonomy skill in one pass over the text.
+
+    Names and aliases are compiled into an Aho-Corasick automaton, so the scan
+    costs O(len(text) + matches) however large the taxonomy grows. A match only
+    counts when it is not glued to other letters or digits ("java" does not
+    fire inside "javascript"), and overlapping matches resolve to the longest
+    one ("node.js" wins over the "js" inside it).
+    """
+
+    def __init__(self, taxonomy):
+        self.skills = [entry["name"] for entry in taxonomy]
+        self.categories = [entry.get("category", "other") for entry in taxonomy]
+        # Content hash of everything that changes what extract() returns
+        self.fingerprint = hashlib.sha1(json.dumps(taxonomy, sort_keys=True).encode("utf-8")).hexdigest()
+
+        self._pattern_skill = {}
+        for idx, entry in enumerate(taxonomy):
+            patterns = list(entry.get("aliases", []))
+            if entry.get("match_name", True):
+                patterns.append(entry["name"])
+            for pattern in patterns:
+                key = _WHITESPACE.sub(" ", pattern.strip().lower())
+                if key:
+                    self._pattern_skill.setdefault(key, idx)
+        self._build_automaton()
+
+    # AUTOMATON
+    def _build_automaton(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for pattern, idx in self._pattern_skill.items():
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((len(pattern), idx))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                if node:
+                    fail = self._fail[node]
+                    while fail and ch not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+
+    # MATCHING
+    def find(self, text):
+        """Return non-overlapping (start, end, skill_index) matches, leftmost-longest"""
+        text = _WHITESPACE.sub(" ", text.lower())
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        node = 0
+        last = len(text) - 1
+        for pos, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            if pos < last and _is_word_char(text[pos + 1]) and _is_word_char(ch):
+                continue
+            for length, idx in out[node]:
+                start = pos - length + 1
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                matches.append((start, pos + 1, idx))
+
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        selected = []
+        end = -1
+        for match in matches:
+            if match[0] >= end:
+                selected.append(match)
+                end = match[1]
+        return selected
+
+    def extract_indices(self, text):
+        """Sorted taxonomy indices of the skills found in the text"""
+        return sorted({idx for _, _, idx in self.find(text)})
+
+    def extract(self, text):
+        """Canonical skill names found in the text, in taxonomy order"""
+        return [self.skills[idx] for idx in self.extract_indices(text)]
+
+    def canonical(self, name):
+        """Map a skill name or alias to its canonical name, or None"""
+        idx = self._pattern_skill.get(_WHITESPACE.sub(" ", name.strip().lower()))
+        return None if idx is None else self.skills[idx]
+
+
+def load_taxonomy(path=TAXONOMY_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def load_skill_extractor(path=TAXONOMY_FILE):
+    """Build the extractor once per process"""
+    return SkillExtractor(load_taxonomy(path))
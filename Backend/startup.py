@@ -0,0 +1,61 @@
+"""Cold-start timing: per-stage import and first-inference durations.
+
+The app records each stage the first time it runs in a process. For a full
+breakdown in a fresh interpreter run:  python -m Backend.startup
+"""
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+STARTUP_TIMINGS = {}
+_timings_lock = threading.Lock()
+
+
+def record_stage(stage, seconds):
+    """Keep the first measurement of a stage; later reruns are warm and not recorded"""
+    with _timings_lock:
+        STARTUP_TIMINGS.setdefault(stage, seconds)
+
+
+@contextmanager
+def timed(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def timed_import(module_name):
+    """Import a module, recording how long it took if it was not yet loaded"""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    with timed(f"import {module_name}"):
+        return importlib.import_module(module_name)
+
+
+def startup_report():
+    """Recorded stages as rows in the order they first ran"""
+    with _timings_lock:
+        return [{"Stage": stage, "Seconds": round(seconds, 3)} for stage, seconds in STARTUP_TIMINGS.items()]
+
+
+if __name__ == "__main__":
+    for module_name in ["streamlit", "sqlalchemy", "numpy", "pandas", "reportlab.platypus", "sentence_transformers"]:
+        try:
+            timed_import(module_name)
+        except ImportError as exc:
+            print(f"skip {module_name}: {exc}")
+
+    from Backend.ai_engine import load_ai_model
+
+    model = load_ai_model()
+    with timed("first inference"):
+        model.encode(["Python, SQL, Docker"])
+    with timed("second inference"):
+        model.encode(["Python, SQL, Docker"])
+
+    for row in startup_report():
+        print(f"{row['Stage']:<40} {row['Seconds']:>8.3f}s")
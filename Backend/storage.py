@@ -0,0 +1,147 @@
+import hashlib
+import hmac
+import os
+from datetime import datetime
+
+from Backend.database import CandidateResult, User, get_session, init_db
+
+DEFAULT_USERS = {
+    "user@gmail.com": {"password": "user123", "role": "user"},
+    "hr@company.com": {"password": "hr456", "role": "user"},
+}
+
+PASSWORD_ITERATIONS = 200_000
+
+
+# PASSWORDS
+def hash_password(password):
+    salt = os.urandom(16).hex()
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt), PASSWORD_ITERATIONS)
+    return f"pbkdf2_sha256${PASSWORD_ITERATIONS}${salt}${digest.hex()}"
+
+
+def verify_password(password, password_hash):
+    try:
+        _, iterations, salt, expected = password_hash.split("$")
+    except (AttributeError, ValueError):
+        return False
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt), int(iterations))
+    return hmac.compare_digest(digest.hex(), expected)
+
+
+# SETUP
+def init_storage():
+    """Create tables and seed the default accounts on an empty database"""
+    init_db()
+    with get_session() as db:
+        if db.query(User).first() is None:
+            for email, info in DEFAULT_USERS.items():
+                db.add(User(email=email, password_hash=hash_password(info["password"]), role=info["role"]))
+
+
+# USERS
+def authenticate(email, password):
+    """Return the user's role when the credentials match, else None"""
+    with get_session() as db:
+        user = db.query(User).filter(User.email == email).first()
+        if user and verify_password(password, user.password_hash):
+            return user.role
+    return None
+
+
+def create_user(email, password, role="user"):
+    """Insert a single user row; False if the email is taken"""
+    with get_session() as db:
+        if db.query(User.id).filter(User.email == email).first():
+            return False
+        db.add(User(email=email, password_hash=hash_password(password), role=role))
+    return True
+
+
+def list_users():
+    with get_session() as db:
+        return [{"Email": email, "Role": role} for email, role in db.query(User.email, User.role).order_by(User.id)]
+
+
+# HISTORY
+def _result_values(result, created_at=None):
+    return dict(
+        jd_title=result.get("job_role"),
+        candidate_name=result.get("candidate"),
+        total_score=result.get("ai_score"),
+        recommendation=result.get("recommendation"),
+        level=result.get("level"),
+        skills=", ".join(result.get("detected_skills", [])),
+        created_at=created_at or datetime.utcnow(),
+        all_skills=", ".join(result["all_skills"]) if "all_skills" in result else None,
+        profile_fingerprint=result.get("profile_fingerprint"),
+        scoring_mode=result.get("scoring_mode"),
+    )
+
+
+def _result_row(result, created_at=None):
+    return CandidateResult(**_result_values(result, created_at))
+
+
+def record_analysis(result):
+    """Insert one analysis as one row and return its id"""
+    with get_session() as db:
+        row = _result_row(result)
+        db.add(row)
+        db.flush()
+        result["id"] = row.id
+        result["timestamp"] = row.created_at
+    return row.id
+
+
+def record_analyses(results):
+    """Insert a batch of analyses with executemany in a single transaction"""
+    from Backend.analytics import bulk_insert_results
+
+    created_at = datetime.utcnow()
+    with get_session() as db:
+        ids = bulk_insert_results(db, [_result_values(r, created_at) for r in results])
+    for result, row_id in zip(results, ids):
+        result["id"] = row_id
+        result["timestamp"] = created_at
+    return ids
+
+
+def _history_dict(r):
+    return {
+        "id": r.id,
+        "candidate": r.candidate_name,
+        "job_role": r.jd_title,
+        "recommendation": r.recommendation,
+        "ai_score": r.total_score,
+        "level": r.level,
+        "detected_skills": r.skills.split(", ") if r.skills else [],
+        "timestamp": r.created_at,
+    }
+
+
+def list_history(limit=500):
+    """Most recent analyses as plain dicts for the History page"""
+    from Backend.analytics import list_results_page
+
+    with get_session() as db:
+        rows, _ = list_results_page(db, limit=limit, order="recent")
+        return [_history_dict(r) for r in rows]
+
+
+def get_results(ids):
+    """History dicts for the given result ids"""
+    if not ids:
+        return []
+    with get_session() as db:
+        rows = db.query(CandidateResult).filter(CandidateResult.id.in_(list(ids))).all()
+        return [_history_dict(r) for r in rows]
+
+
+def delete_all_data():
+    from Backend.analytics import clear_all_results
+
+    with get_session() as db:
+        clear_all_results(db)
+        db.query(User).delete()
+    init_storage()
@@ -1,228 +1,37 @@
+import time
+_app_start = time.perf_counter()
 import streamlit as st
-import pandas as pd
-import pickle
 import os
-import io
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from datetime import datetime
-from sentence_transformers import SentenceTransformer, util
-import numpy as np
+from Backend.startup import record_stage, startup_report, timed
+record_stage("import streamlit", time.perf_counter() - _app_start)
 
-# FILE BASED PERSISTENT STORAGE
-USERS_FILE = "skillsense_users.pkl"
-HISTORY_FILE = "skillsense_history.pkl"
+# Only the login stack loads here; ML, PDF and pandas load after login
+with timed("import storage"):
+    from Backend.database import DATABASE_URL
+    from Backend.storage import (
+        authenticate, create_user, delete_all_data, get_results, init_storage,
+        list_users,
+    )
+    from Backend.migrate_pickles import migrate_pickles
 
-# Load/Save functions
-def load_users():
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, 'rb') as f:
-            return pickle.load(f)
-    return {
-        "user@gmail.com": {"password": "user123", "role": "user"},
-        "hr@company.com": {"password": "hr456", "role": "user"}
-    }
-
-def save_users(users):
-    with open(USERS_FILE, 'wb') as f:
-        pickle.dump(users, f)
-
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, 'rb') as f:
-            return pickle.load(f)
-    return []
-
-def save_history(history):
-    with open(HISTORY_FILE, 'wb') as f:
-        pickle.dump(history, f)
-
-# Load data
-users_db = load_users()
-history_db = load_history()
-
-ADMIN_AUTH_CODE = "SSAI-ADMIN-2026-X7K9"
+# DATABASE PERSISTENT STORAGE
+@st.cache_resource
+def init_app_storage():
+    with timed("init storage"):
+        init_storage()
+        migrate_pickles()
 
-def generate_interview_questions(detected_skills, level):
-    """Generate targeted interview questions based on detected skills"""
-    questions = []
-    for skill in detected_skills[:5]:
-        questions.extend([
-            f"Can you describe your hands-on experience with {skill}?",
-            f"What was the most challenging project you worked on using {skill}?",
-            f"How do you approach debugging issues in {skill} projects?"
-        ])
-    return questions[:8]
+init_app_storage()
 
-# AI FUNCTION (HUGGINGFACE)
 @st.cache_resource
-def load_ai_model():
-    return SentenceTransformer('all-MiniLM-L6-v2')
+def init_history_store():
+    from Backend.history_store import load_history_store, sync_with_db
+    with timed("sync history store"):
+        store = load_history_store()
+        sync_with_db(store)
+    return store
 
-def ai_resume_analysis(resume_text, job_role="Software Developer"):
-    try:
-        model = load_ai_model()
-        
-        # Extract skills from resume
-        resume_lower = resume_text.lower()
-        detected_skills = []
-        skill_list = ["python", "react", "java", "sql", "aws", "docker", "angular", "node", "javascript", "mysql"]
-        
-        for skill in skill_list:
-            if skill in resume_lower:
-                detected_skills.append(skill.title())
-        
-        # Job required skills
-        job_skills = ["python", "react", "sql", "aws", "docker", "node"]
-        
-        # AI Similarity calculation
-        if detected_skills:
-            resume_text = ", ".join(detected_skills)
-            job_text = ", ".join(job_skills)
-            resume_emb = model.encode([resume_text])
-            job_emb = model.encode([job_text])
-            similarity = util.cos_sim(resume_emb, job_emb).item() * 100
-        else:
-            similarity = 20
-        
-        # AI Recommendation
-        score = min(95, max(25, int(similarity)))
-        recommendation = "HIRE" if score > 75 else "INTERVIEW" if score > 50 else "REVIEW"
-        
-        # Generate interview questions
-        interview_questions = generate_interview_questions(detected_skills, "Mid")
-        
-        return {
-            "ai_score": score,
-            "recommendation": recommendation,
-            "detected_skills": detected_skills[:8],
-            "job_fit": f"{score}% match for {job_role}",
-            "strengths": detected_skills[:3],
-            "confidence": "High" if score > 70 else "Medium",
-            "interview_questions": interview_questions
-        }
-    except:
-        return {
-            "ai_score": 50,
-            "recommendation": "REVIEW",
-            "detected_skills": [],
-            "job_fit": "AI temporarily unavailable",
-            "strengths": [],
-            "confidence": "Low",
-            "interview_questions": []
-        }
-
-def generate_hiring_pdf(results):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # HEADER
-    story.append(Paragraph("SkillSense AI - Resume Analysis Report", styles['Title']))
-    story.append(Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y %I:%M %p')}", styles['Normal']))
-    story.append(Spacer(1, 20))
-    
-    # CANDIDATE INFO TABLE
-    candidate_data = [["Candidate Name:", results['candidate']], 
-                     ["Position Level:", results.get('level', 'N/A')],
-                     ["Analysis Date:", datetime.now().strftime('%Y-%m-%d')]]
-    
-    candidate_table = Table(candidate_data, colWidths=[2*inch, 3.5*inch])
-    candidate_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
-        ('FONTNAME', (0, 0), (0, 0), 'Helvetica-Bold'),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 0), (-1, -1), 12)
-    ]))
-    story.extend([candidate_table, Spacer(1, 20)])
-    
-    # MAIN DECISION TABLE
-    ai_score = results.get('ai_score', 0)
-    decision_data = [
-        ["Metric", "Status", "Score"],
-        ["Hiring Decision", results.get('recommendation', 'N/A'), f"{ai_score}%"],
-        ["Skill Match", f"{len(results.get('detected_skills', []))} Skills"],
-        ["AI Recommendation", results.get('job_fit', 'N/A')]
-    ]
-    
-    decision_table = Table(decision_data, colWidths=[1.8*inch, 2.2*inch, 1.8*inch])
-    decision_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen if ai_score > 70 else colors.lightcoral),
-        ('GRID', (0, 0), (-1, -1), 2, colors.black),
-        ('FONTSIZE', (0, 1), (-1, -1), 12)
-    ]))
-    
-    story.extend([Paragraph("AI-ENHANCED HIRING DECISION", styles['Heading1']), 
-                 Spacer(1, 12), decision_table, Spacer(1, 20)])
-    
-    # SKILLS GRID
-    all_skills = results.get('detected_skills', [])
-    story.append(Paragraph("DETECTED TECHNICAL SKILLS", styles['Heading2']))
-    if all_skills:
-        skills_data = []
-        for i in range(0, len(all_skills), 2):
-            row = [all_skills[i]]
-            if i+1 < len(all_skills):
-                row.append(all_skills[i+1])
-            skills_data.append(row)
-        
-        skills_table = Table(skills_data, colWidths=[3*inch, 3*inch])
-        skills_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.ivory),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.darkgreen),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
-        ]))
-        story.append(skills_table)
-    story.append(Spacer(1, 20))
-    
-    # INTERVIEW QUESTIONS
-    questions = results.get('interview_questions', [])
-    if questions:
-        story.append(Paragraph("INTERVIEW QUESTIONS", styles['Heading2']))
-        for i, question in enumerate(questions[:6], 1):
-            story.append(Paragraph(f"{i}. {question}", styles['Normal']))
-            story.append(Spacer(1, 8))
-    
-    # ANALYSIS
-    story.append(Paragraph("DETAILED AI ANALYSIS", styles['Heading2']))
-    analysis_para = Paragraph(f"""
-    <b>AI Score:</b> {ai_score}% semantic match using HuggingFace Transformers<br/>
-    <b>Skills Found:</b> {len(all_skills)} technical skills detected<br/>
-    <b>Position Fit:</b> {results.get('level', 'N/A')} level position<br/>
-    <b>Recommendation:</b> {results.get('recommendation', 'N/A')}<br/><br/>
-    
-    <b>Powered by:</b> SkillSense AI + HuggingFace AI
-    """, styles['Normal'])
-    story.append(analysis_para)
-    
-    # FOOTER
-    story.append(Spacer(1, 20))
-    footer_data = [["Generated by:", "SkillSense AI Enterprise + HuggingFace AI"], 
-                  ["Report ID:", f"SSAI-{datetime.now().strftime('%Y%m%d%H%M')}"]]
-    footer_table = Table(footer_data, colWidths=[2*inch, 3.5*inch])
-    footer_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(footer_table)
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+ADMIN_AUTH_CODE = "SSAI-ADMIN-2026-X7K9"
 
 # SESSION STATE
 if 'logged_in' not in st.session_state: 
@@ -233,6 +42,10 @@ if 'user_role' not in st.session_state:
     st.session_state.user_role = None
 if 'results' not in st.session_state: 
     st.session_state.results = None
+if 'batch_results' not in st.session_state: 
+    st.session_state.batch_results = None
+if 'match_result' not in st.session_state: 
+    st.session_state.match_result = None
 
 st.set_page_config(page_title="SkillSense AI", layout="wide")
 
@@ -251,10 +64,11 @@ if not st.session_state.logged_in:
             password = st.text_input("Password", type="password")
             
             if st.form_submit_button("LOGIN", type="primary"):
-                if email in users_db and users_db[email]["password"] == password:
+                role = authenticate(email, password)
+                if role:
                     st.session_state.logged_in = True
                     st.session_state.current_user = email
-                    st.session_state.user_role = users_db[email]["role"]
+                    st.session_state.user_role = role
                     st.success(f"Welcome back {email}!")
                     st.rerun()
                 else:
@@ -272,9 +86,7 @@ if not st.session_state.logged_in:
             with col1:
                 if st.form_submit_button("Create USER Account", type="secondary"):
                     if email and password:
-                        if email not in users_db:
-                            users_db[email] = {"password": password, "role": "user"}
-                            save_users(users_db)
+                        if create_user(email, password, "user"):
                             st.success(f"User account SAVED: {email}")
                             st.info("Login anytime with same details!")
                         else:
@@ -286,20 +98,34 @@ if not st.session_state.logged_in:
                 admin_code = st.text_input("Admin Auth Code", type="password", placeholder="")
                 if st.form_submit_button("Create ADMIN Account", type="primary"):
                     if email and password:
-                        if email not in users_db:
-                            if admin_code == ADMIN_AUTH_CODE:
-                                users_db[email] = {"password": password, "role": "admin"}
-                                save_users(users_db)
-                                st.success(f"Admin account SAVED: {email}")
-                            else:
-                                st.error("Wrong admin code!")
+                        if admin_code != ADMIN_AUTH_CODE:
+                            st.error("Wrong admin code!")
+                        elif create_user(email, password, "admin"):
+                            st.success(f"Admin account SAVED: {email}")
                         else:
                             st.error("Email already exists!")
                     else:
                         st.error("Fill all fields!")
 
 else:
-    # DASHBOARD
+    # DASHBOARD (heavy stacks load here, after login)
+    with timed("import pandas"):
+        import pandas as pd
+    with timed("import ai engine"):
+        from Backend.ai_engine import (
+            ai_resume_analysis_batch, encode_search_query, history_report,
+            load_embedding_index, load_job_profiles, model_status, save_analyses,
+            start_model_warmup,
+        )
+        from Backend.dedupe import load_near_duplicate_index
+        from Backend.inference_service import INFERENCE_URL
+        from Backend.rerank import maybe_start_rerank, outdated_counts, rerank_status, start_rerank
+        from Backend.result_cache import load_result_cache
+    from Backend import metrics
+    start_model_warmup()
+    maybe_start_rerank()
+    metrics.start_metrics_server()
+    
     st.sidebar.markdown("SkillSense AI")
     st.sidebar.markdown(f"User: {st.session_state.current_user}")
     st.sidebar.markdown(f"Role: {st.session_state.user_role.upper()}")
@@ -309,34 +135,106 @@ else:
         st.session_state.current_user = None
         st.session_state.user_role = None
         st.session_state.results = None
+        st.session_state.batch_results = None
+        st.session_state.match_result = None
         st.rerun()
     
     # Navigation
     if st.session_state.user_role == "admin":
-        page = st.sidebar.radio("Dashboard", ["Resume Analyzer", "History", "Admin"])
+        page = st.sidebar.radio("Dashboard", ["Resume Analyzer", "History", "Role Matching", "Analytics", "Admin"])
     else:
         page = st.sidebar.radio("Dashboard", ["Resume Analyzer"])
     
     if page == "Resume Analyzer":
         st.title("SkillSense AI - Resume Analyzer")
         
-        col1, col2 = st.columns([2,1])
-        with col1:
-            resume_text = st.text_area("Paste Resume", height=300)
-        with col2:
-            name = st.text_input("Candidate Name")
+        mode = st.radio("Mode", ["Single Resume", "Bulk Upload"], horizontal=True)
+        
+        if mode == "Bulk Upload":
+            uploads = st.file_uploader(
+                "Upload Resumes (PDF, DOCX, TXT or ZIP)",
+                type=["pdf", "docx", "txt", "zip"],
+                accept_multiple_files=True
+            )
+            job_role = st.selectbox("Job Role", load_job_profiles().roles())
             level = st.select_slider("Level", ["Junior", "Mid", "Senior"])
+            full_text = st.checkbox("Score full resume text (slower, counts experience descriptions)")
+            
+            if st.button("AI BATCH ANALYSIS", type="primary", use_container_width=True):
+                if uploads:
+                    from Backend.ingest import stream_batches
+                    status = st.empty()
+                    table = st.empty()
+                    batch_results, failures = [], []
+                    duplicates = 0
+                    # Analyze micro-batches as soon as their text is extracted
+                    for extracted, failed in stream_batches(uploads, batch_size=16):
+                        failures.extend(failed)
+                        if extracted:
+                            texts = [item["text"] for item in extracted]
+                            scoring_mode = "chunks" if full_text else None
+                            results, embeddings = ai_resume_analysis_batch(
+                                texts, job_role, return_embeddings=True, scoring_mode=scoring_mode, dedupe=True
+                            )
+                            for item, ai_result in zip(extracted, results):
+                                ai_result["candidate"] = os.path.splitext(os.path.basename(item["name"]))[0]
+                                ai_result["level"] = level
+                                ai_result["truncated"] = item["truncated"]
+                            save_analyses(results, embeddings, texts, scoring_mode)
+                            batch_results.extend(results)
+                            duplicates += sum(1 for r in results if r.get("duplicate_of") is not None)
+                        status.info(f"Analyzed {len(batch_results)} resumes ({duplicates} near-duplicates reused), {len(failures)} skipped...")
+                        if batch_results:
+                            table.dataframe(
+                                pd.DataFrame(batch_results)[['candidate', 'recommendation', 'ai_score', 'job_fit']],
+                                use_container_width=True
+                            )
+                    table.empty()
+                    st.session_state.batch_results = batch_results
+                    status.success(f"Analyzed {len(batch_results)} resumes ({duplicates} near-duplicates reused)")
+                    for item in failures:
+                        st.warning(f"Skipped {item['name']}: {item['error']}")
+                else:
+                    st.error("Upload at least one resume!")
+            
+            if st.session_state.get('batch_results'):
+                batch_df = pd.DataFrame(st.session_state.batch_results)
+                columns = ['candidate', 'recommendation', 'ai_score', 'job_fit']
+                if 'duplicate_candidate' in batch_df:
+                    columns.append('duplicate_candidate')
+                st.dataframe(
+                    batch_df[columns].sort_values('ai_score', ascending=False),
+                    use_container_width=True
+                )
+            resume_text = None
+        else:
+            col1, col2 = st.columns([2,1])
+            with col1:
+                resume_text = st.text_area("Paste Resume", height=300)
+            with col2:
+                name = st.text_input("Candidate Name")
+                job_role = st.selectbox("Job Role", load_job_profiles().roles())
+                level = st.select_slider("Level", ["Junior", "Mid", "Senior"])
+                full_text = st.checkbox("Score full resume text")
         
         # AI ANALYSIS BUTTON
-        if st.button("AI ANALYSIS", type="primary", use_container_width=True):
+        if resume_text is not None and st.button("AI ANALYSIS", type="primary", use_container_width=True):
             with st.spinner("AI analyzing with HuggingFace Transformers..."):
-                ai_result = ai_resume_analysis(resume_text)
+                scoring_mode = "chunks" if full_text else None
+                results, embeddings = ai_resume_analysis_batch(
+                    [resume_text], job_role, return_embeddings=True, scoring_mode=scoring_mode, dedupe=True
+                )
+                ai_result = results[0]
                 ai_result["candidate"] = name or "Candidate"
                 ai_result["level"] = level
                 st.session_state.results = ai_result
-                history_db.append(ai_result)
-                save_history(history_db)
+                save_analyses([ai_result], embeddings, [resume_text], scoring_mode)
                 st.success(f"AI Score: {ai_result['ai_score']}%")
+                if ai_result.get("duplicate_of") is not None:
+                    st.info(
+                        f"Near-duplicate ({ai_result['duplicate_similarity']:.0%}) of {ai_result['duplicate_candidate']} "
+                        f"(#{ai_result['duplicate_of']}); reused that analysis"
+                    )
         
         # DISPLAY RESULTS
         if st.session_state.get('results'):
@@ -379,21 +277,179 @@ else:
         
         # PDF DOWNLOAD (Admin only)
         if st.session_state.results and st.session_state.user_role == "admin":
-            pdf_data = generate_hiring_pdf(st.session_state.results)
+            with timed("import reportlab"):
+                from Backend.reports import render_hiring_pdf, report_filename
             st.download_button(
                 "Download AI-Enhanced PDF Report",
-                pdf_data.getvalue(),
-                f"SkillSense_AI_Report_{st.session_state.results['candidate'].replace(' ', '_')}.pdf",
+                render_hiring_pdf(st.session_state.results),
+                report_filename(st.session_state.results),
                 "application/pdf"
             )
     
     elif page == "History" and st.session_state.user_role == "admin":
         st.title("Analysis History")
-        if history_db:
-            df = pd.DataFrame(history_db)
-            st.dataframe(df[['candidate', 'recommendation', 'ai_score', 'timestamp']], use_container_width=True)
+        from Backend.history_store import SORT_COLUMNS
+        store = init_history_store()
+        
+        # Filtering, sorting and paging all happen in the store; only one page is read
+        col1, col2, col3, col4 = st.columns(4)
+        role_filter = col1.selectbox("Job Role", ["All"] + load_job_profiles().roles())
+        rec_filter = col2.multiselect("Recommendation", ["HIRE", "INTERVIEW", "REVIEW"])
+        min_score = col3.slider("Minimum Score", 0, 100, 0)
+        name_filter = col4.text_input("Candidate contains")
+        filters = {
+            "job_role": None if role_filter == "All" else role_filter,
+            "recommendations": rec_filter,
+            "min_score": min_score,
+            "candidate": name_filter.strip(),
+        }
+        col1, col2, col3 = st.columns(3)
+        sort_by = col1.selectbox("Sort by", SORT_COLUMNS)
+        descending = col2.radio("Order", ["Descending", "Ascending"], horizontal=True) == "Descending"
+        page_size = col3.selectbox("Rows per page", [25, 50, 100, 200], index=1)
+        total = store.count(filters)
+        pages = max(1, -(-total // page_size))
+        page_number = st.number_input("Page", min_value=1, max_value=pages, value=1)
+        history = store.page((page_number - 1) * page_size, page_size, sort_by, descending, filters)
+        if history:
+            df = pd.DataFrame(history)
+            st.dataframe(df[['candidate', 'job_role', 'recommendation', 'ai_score', 'timestamp']], use_container_width=True)
+            st.caption(f"Page {page_number} of {pages} ({total} analyses)")
         else:
             st.info("No analysis history yet")
+        
+        # BULK PDF EXPORT
+        if history:
+            st.subheader("Export Reports")
+            labels = {f"#{h['id']} {h['candidate']} ({h['job_role']})": h['id'] for h in history}
+            export_all = st.checkbox("Select all rows on this page")
+            selected_rows = list(labels) if export_all else st.multiselect("Rows to export", list(labels))
+            if st.button("Export Selected Reports (ZIP)") and selected_rows:
+                from Backend.reports import export_reports_zip
+                with st.spinner(f"Rendering {len(selected_rows)} reports..."):
+                    rows = {r["id"]: r for r in get_results([labels[label] for label in selected_rows])}
+                    zip_file = export_reports_zip([history_report(rows[labels[label]]) for label in selected_rows if labels[label] in rows])
+                st.download_button(
+                    "Download Reports ZIP",
+                    zip_file,
+                    f"SkillSense_Reports_{len(selected_rows)}.zip",
+                    "application/zip"
+                )
+        
+        # SEMANTIC CANDIDATE SEARCH
+        st.subheader("Find Similar Candidates")
+        index = load_embedding_index()
+        search_mode = st.radio("Search by", ["Job Description", "Stored Candidate"], horizontal=True)
+        top_k = st.slider("Top matches", 1, 50, 10)
+        query, exclude = None, ()
+        if search_mode == "Job Description":
+            jd_text = st.text_area("Paste Job Description or Resume", height=150)
+            if st.button("Search Candidates") and jd_text.strip():
+                query = encode_search_query(jd_text)
+        elif history:
+            options = {f"#{h['id']} {h['candidate']} ({h['job_role']})": h['id'] for h in history}
+            selected = st.selectbox("Candidate", list(options))
+            if st.button("Search Candidates"):
+                query = index.vector(options[selected])
+                exclude = (options[selected],)
+                if query is None:
+                    st.warning("No stored embedding for this candidate")
+        
+        if query is not None:
+            matches = index.search(query, top_k, exclude_ids=exclude)
+            rows = {r["id"]: r for r in get_results([result_id for result_id, _ in matches])}
+            match_df = pd.DataFrame([
+                {**rows[result_id], "similarity": round(score * 100, 1)}
+                for result_id, score in matches if result_id in rows
+            ])
+            if len(match_df):
+                st.dataframe(match_df[['candidate', 'job_role', 'ai_score', 'similarity', 'timestamp']], use_container_width=True)
+            else:
+                st.info(f"No matches among {index.count()} indexed resumes")
+    
+    elif page == "Role Matching" and st.session_state.user_role == "admin":
+        st.title("Role Matching")
+        st.markdown("Score an applicant pool against several open roles at once")
+        uploads = st.file_uploader(
+            "Upload Resumes (PDF, DOCX, TXT or ZIP)",
+            type=["pdf", "docx", "txt", "zip"],
+            accept_multiple_files=True,
+            key="match_uploads"
+        )
+        all_roles = load_job_profiles().roles()
+        roles = st.multiselect("Open Roles", all_roles, default=all_roles)
+        top_k = st.slider("Top candidates per role", 1, 50, 10)
+        
+        if st.button("MATCH CANDIDATES", type="primary", use_container_width=True):
+            if uploads and roles:
+                from Backend.ingest import stream_batches
+                from Backend.matching import match_resumes
+                names, failures = [], []
+                
+                def resume_texts():
+                    # Extraction streams straight into the matcher; texts are never all held at once
+                    for extracted, failed in stream_batches(uploads, batch_size=64):
+                        failures.extend(failed)
+                        for item in extracted:
+                            names.append(os.path.splitext(os.path.basename(item["name"]))[0])
+                            yield item["text"]
+                
+                with st.spinner("Matching candidates to roles..."):
+                    match = match_resumes(resume_texts(), roles, top_k)
+                st.session_state.match_result = (match, names)
+                for item in failures:
+                    st.warning(f"Skipped {item['name']}: {item['error']}")
+            else:
+                st.error("Upload resumes and pick at least one role!")
+        
+        if st.session_state.get('match_result'):
+            match, names = st.session_state.match_result
+            st.success(f"Matched {match['count']} candidates against {len(match['roles'])} roles")
+            for tab, role in zip(st.tabs(match["roles"]), match["roles"]):
+                with tab:
+                    st.dataframe(pd.DataFrame([
+                        {"candidate": names[i], "ai_score": score} for i, score in match["top_candidates"][role]
+                    ]), use_container_width=True)
+            
+            st.subheader("Best Role per Candidate")
+            best_df = pd.DataFrame({
+                "candidate": names,
+                "best_role": [role for role, _ in match["best_role"]],
+                "ai_score": [score for _, score in match["best_role"]],
+            }).sort_values("ai_score", ascending=False)
+            st.dataframe(best_df, use_container_width=True)
+            st.download_button("Download Matches (CSV)", best_df.to_csv(index=False), "SkillSense_Role_Matches.csv", "text/csv")
+    
+    elif page == "Analytics" and st.session_state.user_role == "admin":
+        from Backend import analytics
+        from Backend.database import get_session
+        st.title("Hiring Analytics")
+        
+        with get_session() as db:
+            summary = analytics.score_summary(db)
+            if not summary["count"]:
+                st.info("No analysis history yet")
+            else:
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Candidates", summary["count"])
+                col2.metric("Average Score", f"{summary['mean']:.1f}%")
+                col3.metric("Best Score", f"{summary['max']:.0f}%")
+                
+                st.subheader("Score Distribution")
+                hist_df = pd.DataFrame(analytics.score_histogram(db))
+                hist_df["range"] = hist_df.apply(lambda r: f"{r.bin_start:.0f}-{r.bin_end:.0f}", axis=1)
+                st.bar_chart(hist_df.set_index("range")["count"])
+                
+                st.subheader("Per Role")
+                role_df = pd.DataFrame(analytics.rubric_averages(db))
+                percentiles = analytics.rubric_percentiles(db)
+                pct_df = pd.DataFrame.from_dict(percentiles, orient="index")
+                st.dataframe(role_df.join(pct_df, on="jd_title"), use_container_width=True)
+                
+                st.subheader("Hiring Funnel")
+                bucket = st.radio("Bucket", ["day", "week", "month"], index=1, horizontal=True)
+                funnel_df = pd.DataFrame(analytics.hiring_funnel(db, bucket))
+                st.line_chart(funnel_df.set_index("period")[["analyzed", "interview", "hire"]])
     
     elif page == "Admin" and st.session_state.user_role == "admin":
         st.title("Admin Panel")
@@ -401,21 +457,91 @@ else:
         
         with col1:
             st.subheader("All User Accounts")
-            user_df = pd.DataFrame([
-                {"Email": email, "Role": info["role"]} 
-                for email, info in users_db.items()
-            ])
+            user_df = pd.DataFrame(list_users())
             st.dataframe(user_df)
-            st.info(f"Files: skillsense_users.pkl, skillsense_history.pkl")
+            st.info(f"Database: {DATABASE_URL}")
         
         with col2:
             if st.button("Delete All Data"):
-                if os.path.exists(USERS_FILE):
-                    os.remove(USERS_FILE)
-                if os.path.exists(HISTORY_FILE):
-                    os.remove(HISTORY_FILE)
+                delete_all_data()
+                load_embedding_index().clear()
+                init_history_store().clear()
+                result_cache = load_result_cache()
+                if result_cache is not None:
+                    result_cache.clear()
+                duplicate_index = load_near_duplicate_index()
+                if duplicate_index is not None:
+                    duplicate_index.clear()
                 st.success("All data deleted!")
                 st.rerun()
+        
+        # PIPELINE METRICS
+        st.subheader("Pipeline Metrics")
+        stage_df = pd.DataFrame(metrics.stage_rows())
+        if len(stage_df):
+            st.dataframe(stage_df, use_container_width=True)
+        else:
+            st.info("No analyses recorded in this process yet")
+        hit_rates = metrics.cache_hit_rates()
+        if hit_rates:
+            cols = st.columns(len(hit_rates))
+            for col, (cache, rate) in zip(cols, sorted(hit_rates.items())):
+                col.metric(f"{cache} cache hit rate", f"{rate:.0%}")
+        result_cache = load_result_cache()
+        if result_cache is not None:
+            cache_stats = result_cache.stats()
+            lookups = cache_stats["hits"] + cache_stats["misses"]
+            cols = st.columns(3)
+            cols[0].metric("Cached analyses", f"{cache_stats['entries']:,}")
+            cols[1].metric("Result cache size", f"{cache_stats['bytes'] / 2**20:.1f} / {cache_stats['max_bytes'] / 2**20:.0f} MB")
+            cols[2].metric("Result cache hit rate (all time)", f"{cache_stats['hits'] / lookups:.0%}" if lookups else "n/a")
+        with st.expander("Counters"):
+            st.dataframe(pd.DataFrame(metrics.counter_rows()), use_container_width=True)
+        st.download_button("Download Prometheus Metrics", metrics.prometheus_text(), "skillsense_metrics.prom", "text/plain")
+        
+        # CANDIDATE RE-RANKING
+        st.subheader("Candidate Re-ranking")
+        counts = outdated_counts()
+        st.dataframe(pd.DataFrame([
+            {"Role": role, "Candidates": c["candidates"], "Outdated": c["outdated"],
+             "Needs re-analysis": c["reanalyze"], "Unversioned": c["unversioned"]}
+            for role, c in counts.items()
+        ]), use_container_width=True)
+        status = rerank_status()
+        if status["state"] == "running":
+            total = max(status["total"], 1)
+            st.progress(min(status["done"] / total, 1.0), text=f"Re-ranking {status['role'] or '...'}: {status['done']:,} / {status['total']:,}")
+            if st.button("Refresh status"):
+                st.rerun()
+        elif status["state"] == "done":
+            st.caption(f"Last re-rank updated {status['done']:,} candidates in {status['finished'] - status['started']:.1f}s")
+        elif status["state"] == "busy":
+            st.info(status["error"])
+        elif status["state"] == "failed":
+            st.error(f"Last re-rank failed: {status['error']}")
+        if any(c["reanalyze"] for c in counts.values()):
+            st.caption("Candidates scored on full resume text (chunks mode) are not re-ranked; analyze them again to update.")
+        col1, col2 = st.columns(2)
+        outdated_roles = [role for role, c in counts.items() if c["outdated"]]
+        if col1.button("Re-rank outdated candidates", disabled=not outdated_roles or status["state"] == "running"):
+            start_rerank(outdated_roles)
+            st.rerun()
+        unversioned_roles = [role for role, c in counts.items() if c["unversioned"]]
+        if col2.button("Re-score unversioned candidates", disabled=not unversioned_roles or status["state"] == "running",
+                       help="Rows saved before profile versions were recorded, re-scored from the top 8 skills they kept"):
+            start_rerank(unversioned_roles, unversioned=True)
+            st.rerun()
+        
+        # STARTUP TIMING
+        st.subheader("Startup Timing")
+        st.caption({
+            "ready": "Model ready",
+            "on demand": "Model not loaded: the complete skill score table serves every analysis",
+            "warming up": "Model warming up in background...",
+        }[model_status()])
+        if INFERENCE_URL:
+            st.caption(f"Encoding through the shared inference service at {INFERENCE_URL}")
+        st.dataframe(pd.DataFrame(startup_report()), use_container_width=True)
 
 st.markdown("---")
 st.markdown("SkillSense AI 2026 | Powered by HuggingFace Transformers")
@@ -0,0 +1,148 @@
+"""Load test: the shared inference service against in-process encoding.
+
+Run from the repository root:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --concurrency 1 8 32 --max-wait-ms 10
+    python -m benchmarks.load_test --url http://127.0.0.1:8765   # an already running service
+
+Each simulated user sends single-text encodes back to back, like analyzer
+clicks. The baseline calls one in-process encoder from every thread; the
+service run starts the micro-batching service in its own process (unless
+--url is given) and goes through RemoteEncoder. Reports throughput and
+p50/p99 latency per concurrency level as JSON.
+"""
+import argparse
+import json
+import multiprocessing
+import socket
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.run_benchmarks import load_encoder
+from benchmarks.synthetic import SyntheticCorpus
+
+CONCURRENCY = [1, 4, 16, 32]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve(url, encoder_choice, max_batch, max_wait_ms, max_queue):
+    from Backend.inference_service import make_server
+
+    encoder = load_encoder(encoder_choice)
+    encoder.encode(["warm up"])
+    make_server(encoder, url, "", max_batch, max_wait_ms, max_queue).serve_forever()
+
+
+def _wait_for_service(url, timeout=120):
+    from Backend.inference_service import RemoteEncoder
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return RemoteEncoder(url)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def run_load(encode, texts, concurrency, requests_per_user):
+    """Throughput and latency percentiles for concurrent single-text encodes"""
+    latencies = [[] for _ in range(concurrency)]
+    errors = []
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def user(n):
+        start_barrier.wait()
+        for i in range(requests_per_user):
+            text = texts[(n * requests_per_user + i) % len(texts)]
+            start = time.perf_counter()
+            try:
+                encode([text])
+            except Exception as exc:
+                errors.append(exc)
+                continue
+            latencies[n].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    done = np.array([t for user_latencies in latencies for t in user_latencies]) * 1000
+    return {
+        "concurrency": concurrency,
+        "requests": len(done),
+        "errors": len(errors),
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(done) / seconds, 1),
+        "p50_ms": round(float(np.percentile(done, 50)), 2) if len(done) else None,
+        "p99_ms": round(float(np.percentile(done, 99)), 2) if len(done) else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SkillSense inference service load test")
+    parser.add_argument("--encoder", choices=["auto", "real", "stub"], default="auto")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=50, help="requests per simulated user")
+    parser.add_argument("--url", help="load-test a running service instead of starting one")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--max-queue", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    from Backend.skills import load_skill_extractor
+
+    extractor = load_skill_extractor()
+    texts = [", ".join(extractor.extract(r["text"])) or r["text"] for r in SyntheticCorpus(args.seed).resumes(500)]
+
+    encoder = load_encoder(args.encoder)
+    encoder.encode(texts[:1])
+    report = {
+        "encoder": getattr(encoder, "backend", type(encoder).__name__),
+        "max_batch": args.max_batch,
+        "max_wait_ms": args.max_wait_ms,
+        "in_process": [run_load(encoder.encode, texts, c, args.requests) for c in args.concurrency],
+    }
+    del encoder
+
+    process = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{_free_port()}"
+        process = multiprocessing.get_context("spawn").Process(
+            target=_serve, args=(url, args.encoder, args.max_batch, args.max_wait_ms, args.max_queue), daemon=True
+        )
+        process.start()
+    try:
+        remote = _wait_for_service(url)
+        report["service"] = [run_load(remote.encode, texts, c, args.requests) for c in args.concurrency]
+    finally:
+        if process is not None:
+            process.terminate()
+            process.join()
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
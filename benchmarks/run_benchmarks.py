@@ -0,0 +1,280 @@
+"""Offline benchmark suite for SkillSense.
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --quick
+
+Everything writes to a throwaway directory (database, embedding index,
+history store, profile, chunk and question-bank embeddings, result cache,
+score table). The real encoder is used only if it is already cached
+locally; otherwise a stub encoder stands in. Results are JSON so runs can be diffed across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import SyntheticCorpus
+
+ENCODE_BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+HISTORY_SIZES = [1_000, 100_000, 1_000_000]
+QUICK_HISTORY_SIZES = [1_000, 10_000]
+
+
+def measure(fn, repeats=1):
+    """Best wall time over repeats plus the traced peak allocation of one run"""
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best, peak
+
+
+def load_encoder(choice):
+    from benchmarks.stub_encoder import StubEncoder
+
+    if choice == "stub":
+        return StubEncoder()
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    try:
+        from Backend.ai_engine import MODEL_NAME
+        from Backend.inference import create_encoder
+
+        return create_encoder(MODEL_NAME)
+    except Exception:
+        if choice == "real":
+            raise
+        return StubEncoder()
+
+
+# BENCHMARKS
+def bench_skill_extraction(corpus, n):
+    from Backend.skills import load_skill_extractor
+
+    extractor = load_skill_extractor()
+    resumes = [r["text"] for r in corpus.resumes(n)]
+    total_bytes = sum(len(t) for t in resumes)
+    seconds, peak = measure(lambda: [extractor.extract(t) for t in resumes], repeats=3)
+    return {
+        "resumes": n,
+        "taxonomy_skills": len(extractor.skills),
+        "seconds": round(seconds, 4),
+        "resumes_per_second": round(n / seconds, 1),
+        "mb_per_second": round(total_bytes / seconds / 1e6, 2),
+        "peak_bytes": peak,
+    }
+
+
+def bench_encode(corpus, encoder, batch_sizes):
+    from Backend.skills import load_skill_extractor
+
+    extractor = load_skill_extractor()
+    texts = [", ".join(extractor.extract(r["text"])) or r["text"] for r in corpus.resumes(max(batch_sizes))]
+    rows = []
+    for batch_size in batch_sizes:
+        batch = texts[:batch_size]
+        encoder.encode(batch[:1])
+        seconds, peak = measure(lambda: encoder.encode(batch, batch_size=batch_size), repeats=3)
+        rows.append({
+            "batch_size": batch_size,
+            "seconds": round(seconds, 5),
+            "ms_per_text": round(seconds * 1000 / batch_size, 3),
+            "peak_bytes": peak,
+        })
+    return rows
+
+
+def bench_analysis(corpus, encoder, n, scoring_mode="skills"):
+    from Backend import ai_engine
+    from Backend.result_cache import load_result_cache
+
+    ai_engine.set_ai_model(encoder)
+    cache = load_result_cache()
+    resumes = [r["text"] for r in corpus.resumes(n)]
+    ai_engine.ai_resume_analysis_batch(resumes[:1], scoring_mode=scoring_mode)
+    cache.clear()
+    # The first full pass is cold for the score table and chunk cache, the
+    # best of the repeats warm; the result cache is emptied before each pass
+    # so these measure the analysis itself
+    cold_start = time.perf_counter()
+    ai_engine.ai_resume_analysis_batch(resumes, scoring_mode=scoring_mode)
+    cold_seconds = time.perf_counter() - cold_start
+
+    def analyze_uncached():
+        cache.clear()
+        ai_engine.ai_resume_analysis_batch(resumes, scoring_mode=scoring_mode)
+
+    seconds, peak = measure(analyze_uncached, repeats=3)
+    cached_seconds, _ = measure(lambda: ai_engine.ai_resume_analysis_batch(resumes, scoring_mode=scoring_mode), repeats=3)
+    return {
+        "resumes": n,
+        "scoring_mode": scoring_mode,
+        "cold_seconds": round(cold_seconds, 4),
+        "seconds": round(seconds, 4),
+        "resumes_per_second": round(n / seconds, 1),
+        "cached_seconds": round(cached_seconds, 4),
+        "cached_resumes_per_second": round(n / cached_seconds, 1),
+        "peak_bytes": peak,
+    }
+
+
+def bench_pdf(corpus, n):
+    from Backend.reports import build_hiring_pdf, render_hiring_pdf
+
+    results = [corpus.analysis_result() for _ in range(n)]
+    build_seconds, peak = measure(lambda: [build_hiring_pdf(r) for r in results])
+    for r in results:
+        render_hiring_pdf(r)
+    cached_seconds, _ = measure(lambda: [render_hiring_pdf(r) for r in results], repeats=3)
+    return {
+        "reports": n,
+        "ms_per_report": round(build_seconds * 1000 / n, 3),
+        "cached_ms_per_report": round(cached_seconds * 1000 / n, 4),
+        "peak_bytes": peak,
+    }
+
+
+def bench_history(corpus, sizes, insert_batch=10_000):
+    from Backend import storage
+    from Backend.history_store import load_history_store
+
+    storage.init_storage()
+    store = load_history_store()
+    rows = []
+    stored = 0
+    for size in sizes:
+        start = time.perf_counter()
+        while stored < size:
+            count = min(insert_batch, size - stored)
+            results = [corpus.analysis_result() for _ in range(count)]
+            storage.record_analyses(results)
+            store.append(results)
+            stored += count
+        fill_seconds = time.perf_counter() - start
+
+        single = corpus.analysis_result()
+        save_seconds, _ = measure(lambda: storage.record_analysis(dict(single)), repeats=5)
+        stored += 6
+        load_seconds, load_peak = measure(lambda: storage.list_history(), repeats=3)
+        page_seconds, _ = measure(lambda: store.page(0, 50), repeats=5)
+        sorted_seconds, _ = measure(lambda: store.page(0, 50, sort_by="ai_score"), repeats=5)
+        rows.append({
+            "records": size,
+            "fill_seconds": round(fill_seconds, 3),
+            "save_one_ms": round(save_seconds * 1000, 3),
+            "load_page_ms": round(load_seconds * 1000, 3),
+            "load_peak_bytes": load_peak,
+            "store_page_ms": round(page_seconds * 1000, 3),
+            "store_sorted_page_ms": round(sorted_seconds * 1000, 3),
+        })
+    return rows
+
+def bench_question_bank(corpus, encoder, n_items):
+    from Backend.question_bank import QUESTION_BANK_FILE, QuestionBank
+    from Backend.skills import load_skill_extractor
+
+    with open(QUESTION_BANK_FILE, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    # Scale the real bank up with numbered variants of every item
+    items = [
+        {**item, "id": f"{item['id']}-{i}", "text": f"{item['text']} (variant {i})"}
+        for i in range(max(1, n_items // len(base)))
+        for item in base
+    ]
+    bank = QuestionBank(items)
+    encode_seconds, _ = measure(lambda: QuestionBank(items).ensure_embeddings(encoder.encode))
+    bank.ensure_embeddings(encoder.encode)
+
+    extractor = load_skill_extractor()
+    queries = []
+    for jd in corpus.job_descriptions(50):
+        skills = extractor.extract(jd["text"])
+        queries.append((encoder.encode([", ".join(skills)])[0], skills))
+    seconds, _ = measure(lambda: [bank.retrieve("technical", 8, q, skills) for q, skills in queries], repeats=5)
+    return {
+        "items": len(items),
+        "embed_seconds": round(encode_seconds, 3),
+        "retrieve_ms": round(seconds * 1000 / len(queries), 4),
+    }
+
+
+# RUNNER
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    corpus = SyntheticCorpus(seed=args.seed)
+    encoder = load_encoder(args.encoder)
+    history_sizes = args.history_sizes or (QUICK_HISTORY_SIZES if args.quick else HISTORY_SIZES)
+    scale = 10 if args.quick else 1
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "encoder": getattr(encoder, "backend", type(encoder).__name__),
+        "benchmarks": {},
+    }
+    benches = report["benchmarks"]
+    benches["skill_extraction"] = bench_skill_extraction(corpus, 2000 // scale)
+    benches["encode"] = bench_encode(corpus, encoder, ENCODE_BATCH_SIZES)
+    benches["analysis_batch"] = bench_analysis(corpus, encoder, 1000 // scale)
+    benches["analysis_batch_chunks"] = bench_analysis(corpus, encoder, 1000 // scale, scoring_mode="chunks")
+    benches["pdf_render"] = bench_pdf(corpus, 50 // scale)
+    benches["question_bank"] = bench_question_bank(corpus, encoder, 30_000 // scale)
+    benches["history"] = bench_history(corpus, history_sizes)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report["peak_rss_bytes"] = maxrss if sys.platform == "darwin" else maxrss * 1024
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SkillSense offline benchmarks")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--encoder", choices=["auto", "real", "stub"], default="auto")
+    parser.add_argument("--quick", action="store_true", help="smaller corpora and history sizes")
+    parser.add_argument("--history-sizes", type=int, nargs="+")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="skillsense-bench-") as workdir:
+        # Isolate every on-disk store before the Backend modules read their settings
+        os.environ["SKILLSENSE_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        os.environ["SKILLSENSE_INDEX_DIR"] = os.path.join(workdir, "embedding_index")
+        os.environ["SKILLSENSE_HISTORY_DIR"] = os.path.join(workdir, "history_store")
+        os.environ["SKILLSENSE_PROFILE_EMBEDDINGS_FILE"] = os.path.join(workdir, "profile_embeddings.npz")
+        os.environ["SKILLSENSE_CHUNK_CACHE_FILE"] = os.path.join(workdir, "chunk_embeddings.db")
+        os.environ["SKILLSENSE_QUESTION_EMBEDDINGS_FILE"] = os.path.join(workdir, "question_bank_embeddings.npz")
+        os.environ["SKILLSENSE_RESULT_CACHE_FILE"] = os.path.join(workdir, "analysis_cache.db")
+        os.environ["SKILLSENSE_SCORE_TABLE_FILE"] = os.path.join(workdir, "skill_score_table.db")
+        report = run(args)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
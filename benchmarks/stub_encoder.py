@@ -0,0 +1,31 @@
+import hashlib
+import re
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9+#.]+")
+
+
+class StubEncoder:
+    """Deterministic hashed bag-of-words encoder with the MiniLM output shape.
+
+    Used when the real model is not cached locally, so benchmarks run
+    offline. Absolute encode timings are not comparable with the real model;
+    everything around the encoder is.
+    """
+
+    backend = "stub"
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def _token_vector(self, token):
+        seed = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+    def encode(self, texts, batch_size=32):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in _TOKEN.findall(text.lower()):
+                out[i] += self._token_vector(token)
+        return out / np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
@@ -0,0 +1,77 @@
+"""Seeded generator of synthetic resumes and job descriptions.
+
+Skills are drawn from skills_taxonomy.json (names and aliases) so the text
+exercises the real extractor; the same seed always yields the same corpus.
+"""
+import random
+
+from Backend.skills import load_taxonomy
+
+FIRST_NAMES = ["Aarav", "Priya", "Mohamed", "Sara", "Wei", "Lucia", "Kwame", "Anna", "Ravi", "Noah", "Fatima", "Kenji"]
+LAST_NAMES = ["Khan", "Sheikh", "Garcia", "Chen", "Okafor", "Smith", "Iyer", "Novak", "Silva", "Tanaka", "Haddad"]
+TITLES = ["Software Engineer", "Backend Developer", "Data Scientist", "DevOps Engineer", "Frontend Developer", "Data Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Tech", "Hooli"]
+VERBS = ["Built", "Designed", "Migrated", "Scaled", "Automated", "Optimized", "Led", "Maintained"]
+OBJECTS = ["a payments platform", "an internal analytics dashboard", "the CI pipeline", "a recommendation service",
+           "customer-facing APIs", "the data warehouse", "a mobile checkout flow", "batch ETL jobs"]
+BOILERPLATE = [
+    "References available on request.",
+    "Strong communication skills and a team player.",
+    "Passionate about clean code and continuous learning.",
+]
+
+
+class SyntheticCorpus:
+    def __init__(self, seed=42):
+        self.rng = random.Random(seed)
+        self.taxonomy = load_taxonomy()
+
+    def _skill_mentions(self, count):
+        mentions = []
+        for entry in self.rng.sample(self.taxonomy, count):
+            names = ([entry["name"]] if entry.get("match_name", True) else []) + entry.get("aliases", [])
+            mentions.append(self.rng.choice(names))
+        return mentions
+
+    def resume(self, min_skills=3, max_skills=15, experience_items=4):
+        name = f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+        skills = self._skill_mentions(self.rng.randint(min_skills, max_skills))
+        lines = [name, self.rng.choice(TITLES), "", "SKILLS", ", ".join(skills), "", "EXPERIENCE"]
+        for _ in range(experience_items):
+            lines.append(
+                f"{self.rng.choice(VERBS)} {self.rng.choice(OBJECTS)} at {self.rng.choice(COMPANIES)} "
+                f"using {self.rng.choice(skills)} and {self.rng.choice(skills)}."
+            )
+        lines += ["", self.rng.choice(BOILERPLATE)]
+        return {"candidate": name, "text": "\n".join(lines)}
+
+    def job_description(self, required=6):
+        title = self.rng.choice(TITLES)
+        skills = self._skill_mentions(required)
+        text = (
+            f"We are hiring a {title}. You will {self.rng.choice(VERBS).lower()} {self.rng.choice(OBJECTS)}.\n"
+            f"Requirements: {', '.join(skills)}.\n"
+            f"Nice to have: {', '.join(self._skill_mentions(3))}."
+        )
+        return {"title": title, "text": text}
+
+    def resumes(self, n, **kwargs):
+        return [self.resume(**kwargs) for _ in range(n)]
+
+    def job_descriptions(self, n, **kwargs):
+        return [self.job_description(**kwargs) for _ in range(n)]
+
+    def analysis_result(self, job_role="Software Developer"):
+        """A result dict shaped like ai_resume_analysis output"""
+        score = self.rng.randint(25, 95)
+        skills = [e["name"] for e in self.rng.sample(self.taxonomy, self.rng.randint(1, 8))]
+        return {
+            "candidate": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+            "job_role": job_role,
+            "ai_score": score,
+            "recommendation": "HIRE" if score > 75 else "INTERVIEW" if score > 50 else "REVIEW",
+            "detected_skills": skills,
+            "level": self.rng.choice(["Junior", "Mid", "Senior"]),
+            "job_fit": f"{score}% match for {job_role}",
+            "interview_questions": [f"Can you describe your hands-on experience with {s}?" for s in skills[:6]],
+        }
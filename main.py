@@ -1,40 +1,14 @@
-print("=== HR Prompt Engineering Tool v1 ===\n")
-print("Paste Job Description below.")
-print("Type END and press Enter when finished:\n")
-
-# ---------- INPUT JD ----------
-lines = []
-while True:
-    line = input()
-    if line.strip().upper() == "END":
-        break
-    lines.append(line)
-
-jd = "\n".join(lines)
-
-# ---------- PROCESSING ----------
-tech_qs = [
-    "Explain CI/CD pipelines and their importance.",
-    "How would you deploy a Python app using Docker?",
-    "What is Kubernetes and where have you used it?",
-    "Explain rollback strategies in deployments.",
-    "How do you monitor production systems?"
-]
-
-behav_qs = [
-    "Describe a time you solved a hard technical problem.",
-    "How do you handle tight deadlines?",
-    "Tell about a conflict in your team.",
-    "How do you learn new technologies?",
-    "Explain a failure and what you learned."
-]
-
-tasks = [
-    "Build a simple CI/CD pipeline for a Python application.",
-    "Deploy an application using Docker + Kubernetes.",
-    "Write a system design document for scalable deployment."
-]
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
+JD_EXTENSIONS = (".txt", ".md", ".pdf", ".docx")
+
+# ---------- FRAMEWORK ----------
 rubric = {
     "Technical Skill": "40%",
     "Problem Solving": "25%",
@@ -42,48 +16,233 @@ rubric = {
     "Communication": "15%"
 }
 
-# ---------- DISPLAY ----------
-print("\n=========== OUTPUT ===========\n")
 
-print(" TECHNICAL QUESTIONS")
-for q in tech_qs:
-    print("-", q)
+def build_framework(jd, use_model=True):
+    """Interview framework for one job description, retrieved from the question bank"""
+    from Backend.ai_engine import interview_framework
 
-print("\n BEHAVIORAL QUESTIONS")
-for q in behav_qs:
-    print("-", q)
+    framework = interview_framework(jd, use_model=use_model)
+    framework["rubric"] = dict(rubric)
+    return framework
 
-print("\n ASSESSMENT TASKS")
-for t in tasks:
-    print("-", t)
 
-print("\n SCORING RUBRIC")
-for k, v in rubric.items():
-    print(f"{k}: {v}")
+def render_report(jd, framework):
+    output = []
 
-# ---------- SAVE TO FILE ----------
-output = []
+    output.append("HR PROMPT ENGINEERING TOOL REPORT\n")
+    output.append("\nJOB DESCRIPTION:\n" + jd)
 
-output.append("HR PROMPT ENGINEERING TOOL REPORT\n")
-output.append("\nJOB DESCRIPTION:\n" + jd)
+    output.append("\nTECHNICAL QUESTIONS:\n")
+    for q in framework["technical_questions"]:
+        output.append(q)
 
-output.append("\nTECHNICAL QUESTIONS:\n")
-for q in tech_qs:
-    output.append(q)
+    output.append("\nBEHAVIORAL QUESTIONS:\n")
+    for q in framework["behavioral_questions"]:
+        output.append(q)
 
-output.append("\nBEHAVIORAL QUESTIONS:\n")
-for q in behav_qs:
-    output.append(q)
+    output.append("\nASSESSMENT TASKS:\n")
+    for t in framework["tasks"]:
+        output.append(t)
 
-output.append("\nASSESSMENT TASKS:\n")
-for t in tasks:
-    output.append(t)
+    output.append("\nSCORING RUBRIC:\n")
+    for k, v in framework["rubric"].items():
+        output.append(f"{k}: {v}")
+
+    return "\n".join(output)
+
+
+def print_framework(framework):
+    print("\n=========== OUTPUT ===========\n")
 
-output.append("\nSCORING RUBRIC:\n")
-for k, v in rubric.items():
-    output.append(f"{k}: {v}")
+    print(" TECHNICAL QUESTIONS")
+    for q in framework["technical_questions"]:
+        print("-", q)
+
+    print("\n BEHAVIORAL QUESTIONS")
+    for q in framework["behavioral_questions"]:
+        print("-", q)
 
-with open("report.txt", "w", encoding="utf-8") as f:
-    f.write("\n".join(output))
+    print("\n ASSESSMENT TASKS")
+    for t in framework["tasks"]:
+        print("-", t)
 
-print("\n Report saved as report.txt in project folder.\n")
+    print("\n SCORING RUBRIC")
+    for k, v in framework["rubric"].items():
+        print(f"{k}: {v}")
+
+
+# ---------- BATCH INPUT ----------
+def iter_directory(path):
+    """Yield {"id", "path"} per JD file; workers read the files themselves"""
+    for entry in sorted(os.scandir(path), key=lambda e: e.name):
+        if entry.is_file() and entry.name.lower().endswith(JD_EXTENSIONS):
+            yield {"id": os.path.splitext(entry.name)[0], "path": entry.path}
+
+
+def read_jd_file(path):
+    """(text, error) for one JD file"""
+    if path.lower().endswith((".txt", ".md")):
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read(), None
+    from Backend.ingest import extract_text
+
+    with open(path, "rb") as f:
+        extracted = extract_text(os.path.basename(path), f.read())
+    return extracted["text"], extracted["error"]
+
+
+def iter_jsonl(stream):
+    """Yield {"id", "jd"} per JSON line ({"id"?, "jd" or "text"}); bad lines become errors"""
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        jd_id = f"line{line_number}"
+        try:
+            record = json.loads(line)
+            jd_id = str(record.get("id") or record.get("title") or jd_id)
+            jd = record.get("jd") or record.get("text") or record.get("description")
+            if not isinstance(jd, str):
+                raise ValueError("missing jd/text field")
+            yield {"id": jd_id, "jd": jd}
+        except (ValueError, AttributeError) as exc:
+            yield {"id": jd_id, "jd": "", "error": f"Invalid JSONL record: {exc}"}
+
+
+def iter_jds(source):
+    if source == "-":
+        return iter_jsonl(sys.stdin)
+    if os.path.isdir(source):
+        return iter_directory(source)
+    return _iter_jsonl_file(source)
+
+
+def _iter_jsonl_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        yield from iter_jsonl(f)
+
+
+# ---------- BATCH PROCESSING (runs in worker processes) ----------
+def report_name(jd_id, jd):
+    """Unique, filesystem-safe report name: slug of the id plus a content hash"""
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", jd_id).strip("_")[:60] or "jd"
+    digest = hashlib.sha1(f"{jd_id}\n{jd}".encode("utf-8")).hexdigest()[:10]
+    return f"report_{slug}_{digest}.txt"
+
+
+def process_jd(item, output_dir=None, use_model=True):
+    """Build one framework; write its report when output_dir is set"""
+    result = {"id": item["id"]}
+    jd, error = item.get("jd", ""), item.get("error")
+    if "path" in item:
+        try:
+            jd, error = read_jd_file(item["path"])
+        except OSError as exc:
+            jd, error = "", f"{type(exc).__name__}: {exc}"
+    if error or not jd.strip():
+        result["error"] = error or "Empty job description"
+        return result
+    framework = build_framework(jd, use_model)
+    if output_dir is None:
+        result.update(framework)
+        return result
+    path = os.path.join(output_dir, report_name(item["id"], jd))
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_report(jd, framework))
+    os.replace(tmp, path)
+    result["report"] = path
+    return result
+
+
+def _outcome(future, jd_id):
+    # A failing JD becomes an error record instead of ending the whole batch
+    try:
+        return future.result()
+    except Exception as exc:
+        return {"id": jd_id, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def run_batch(items, workers, output_dir=None, use_model=True):
+    """Process JDs in a pool, yielding results as they finish.
+
+    At most workers * 2 JDs are in flight, so memory stays flat however long
+    the input is.
+    """
+    workers = max(1, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        for item in items:
+            pending[pool.submit(process_jd, item, output_dir, use_model)] = item["id"]
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _outcome(future, pending.pop(future))
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield _outcome(future, pending.pop(future))
+
+
+# ---------- INTERACTIVE ----------
+def run_interactive(use_model=True):
+    print("=== HR Prompt Engineering Tool v1 ===\n")
+    print("Paste Job Description below.")
+    print("Type END and press Enter when finished:\n")
+
+    lines = []
+    while True:
+        line = input()
+        if line.strip().upper() == "END":
+            break
+        lines.append(line)
+
+    jd = "\n".join(lines)
+    framework = build_framework(jd, use_model)
+    print_framework(framework)
+
+    with open("report.txt", "w", encoding="utf-8") as f:
+        f.write(render_report(jd, framework))
+
+    print("\n Report saved as report.txt in project folder.\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HR Prompt Engineering Tool")
+    parser.add_argument("--batch", metavar="SOURCE",
+                        help="directory of JD files, a JSONL file, or - for JSONL on stdin")
+    parser.add_argument("--output-dir", default="reports", help="where batch reports are written")
+    parser.add_argument("--stream", action="store_true",
+                        help="emit one JSON line per JD on stdout instead of writing reports")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--no-model", action="store_true",
+                        help="rank questions by skill tags only, without loading the encoder")
+    args = parser.parse_args()
+
+    if not args.batch:
+        run_interactive(not args.no_model)
+        return
+
+    output_dir = None
+    if not args.stream:
+        output_dir = args.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+    processed = failed = 0
+    for result in run_batch(iter_jds(args.batch), args.workers, output_dir, not args.no_model):
+        processed += 1
+        if "error" in result:
+            failed += 1
+        if args.stream:
+            sys.stdout.write(json.dumps(result) + "\n")
+            sys.stdout.flush()
+        elif "error" in result:
+            print(f" Skipped {result['id']}: {result['error']}", file=sys.stderr)
+
+    summary = f" Processed {processed} job descriptions, {failed} failed."
+    if output_dir:
+        summary += f" Reports saved in {output_dir}/"
+    print(summary, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()